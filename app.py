@@ -1,6 +1,6 @@
 import streamlit as st
 from modules import explicaciones
-from modules import arbol_decision, regresion_lineal, k_medias, regresion_multiple, k_modas  
+from modules.registro import ALGORITMOS, cargar_algoritmo, tiempos_importacion
 
 st.set_page_config(page_title="App de Algoritmos", layout="wide")
 
@@ -24,14 +24,7 @@ st.sidebar.title("🔥 Ejecutar Algoritmos 🔥")
 
 algoritmo_seleccionado = st.sidebar.selectbox(
     "Selecciona el algoritmo para ejecutar:",
-    (
-        "Árbol de Decisión",
-        "Regresión Lineal",
-        "Regresión Múltiple",
-        "K-medias",
-        "K-modas"
-        
-    )
+    tuple(ALGORITMOS)
 )
 
 if explicacion_seleccionada != "Algoritmos":
@@ -47,14 +40,10 @@ if explicacion_seleccionada != "Algoritmos":
         explicaciones.mostrar_explicacion_k_modas()
 
 else:
-    if algoritmo_seleccionado == "Árbol de Decisión":
-        arbol_decision.run()
-    elif algoritmo_seleccionado == "Regresión Lineal":
-        regresion_lineal.run()
-    elif algoritmo_seleccionado == "Regresión Múltiple":
-        regresion_multiple.run()
-    elif algoritmo_seleccionado == "K-medias":
-        k_medias.run()
-    elif algoritmo_seleccionado == "K-modas":
-        k_modas.run()
+    cargar_algoritmo(algoritmo_seleccionado).run()
+
+tiempos = tiempos_importacion()
+if tiempos:
+    with st.sidebar.expander("⏱️ Tiempos de importación"):
+        st.dataframe(tiempos)
 
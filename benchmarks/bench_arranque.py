@@ -0,0 +1,57 @@
+# Benchmark: coste de importación en frío de cada página de algoritmo y del núcleo sin
+# interfaz. Cada medida se hace en un intérprete nuevo, como en el arranque de un contenedor.
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.bench_arranque [repeticiones]
+import subprocess
+import sys
+
+from modules.registro import ALGORITMOS
+
+NUCLEO = ["nucleo.id3", "nucleo.regresion_lineal", "nucleo.regresion_multiple",
+          "nucleo.seleccion_variables", "nucleo.k_medias", "nucleo.k_modas"]
+
+def medir(codigo, repeticiones):
+    # Mínimo de varias ejecuciones para reducir el ruido del sistema
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c",
+             "import time; t = time.perf_counter(); " + codigo + "; print(time.perf_counter() - t)"],
+            capture_output=True, text=True, check=True)
+        tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+    return min(tiempos)
+
+def mas_costosas(modulo, n=5):
+    # -X importtime escribe en stderr: "import time: propio | acumulado | paquete"
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                            capture_output=True, text=True, check=True)
+    paquetes = {}
+    for linea in salida.stderr.splitlines():
+        partes = linea.split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nombre = partes[2].strip()
+        # Solo paquetes de primer nivel (pandas, sklearn, ...), con su acumulado
+        if "." not in nombre and nombre != modulo.split(".")[0]:
+            paquetes[nombre] = max(paquetes.get(nombre, 0), int(partes[1]) / 1e6)
+    return sorted(((seg, nombre) for nombre, seg in paquetes.items()), reverse=True)[:n]
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    base = medir("import streamlit", repeticiones)
+    print(f"streamlit (base): {base:.3f} s")
+    print(f"{'módulo':<28} {'total (s)':>10} {'sobre base (s)':>15}  dependencias más costosas")
+    for ruta in ["modules.explicaciones", *ALGORITMOS.values()]:
+        total = medir(f"import streamlit; import {ruta}", repeticiones)
+        deps = ", ".join(f"{nombre} {seg:.2f}s" for seg, nombre in mas_costosas(ruta))
+        print(f"{ruta:<28} {total:>10.3f} {total - base:>15.3f}  {deps}")
+
+    # El núcleo se mide sin streamlit: es lo que paga un proceso por lotes o un trabajador
+    print(f"\n{'núcleo':<28} {'total (s)':>10}  dependencias más costosas")
+    for ruta in NUCLEO:
+        total = medir(f"import {ruta}; import sys; assert 'streamlit' not in sys.modules", repeticiones)
+        deps = ", ".join(f"{nombre} {seg:.2f}s" for seg, nombre in mas_costosas(ruta))
+        print(f"{ruta:<28} {total:>10.3f}  {deps}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# Benchmark: construcción ID3 en serie vs. evaluación paralela de atributos.
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.bench_id3_paralelo [filas] [trabajadores]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from nucleo.id3 import construir_arbol, extraer_reglas
+
+def generar_datos(n_filas, n_columnas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    valores = np.array([f"v{j}" for j in range(5)], dtype=object)
+    df = pd.DataFrame({f"a{i}": valores[rng.integers(0, 5, n_filas)] for i in range(n_columnas)})
+    # La clase depende de unas pocas columnas para que el árbol no sea trivial
+    df['clase'] = np.where((df['a0'] < 'v2') ^ (df['a1'] == 'v3'), 'si', 'no')
+    df.loc[df['a2'] == 'v4', 'clase'] = 'quizas'
+    return df
+
+def medir(df, features, **kwargs):
+    t0 = time.perf_counter()
+    arbol, _ = construir_arbol(df, features, 'clase', **kwargs)
+    return time.perf_counter() - t0, extraer_reglas(arbol)
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_trabajadores = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    print(f"filas={n_filas} trabajadores={n_trabajadores}")
+    print(f"{'columnas':>8} {'serie (s)':>10} {'hilos (s)':>10} {'procesos (s)':>13} {'speedup':>8}")
+    for n_columnas in (10, 20, 40, 80):
+        df = generar_datos(n_filas, n_columnas)
+        features = [c for c in df.columns if c != 'clase']
+        t_serie, reglas = medir(df, features)
+        t_hilos, reglas_h = medir(df, features, n_trabajadores=n_trabajadores, usar_procesos=False)
+        t_proc, reglas_p = medir(df, features, n_trabajadores=n_trabajadores, usar_procesos=True)
+        assert reglas == reglas_h == reglas_p, "La construcción paralela difiere de la serie"
+        print(f"{n_columnas:>8} {t_serie:>10.3f} {t_hilos:>10.3f} {t_proc:>13.3f} {t_serie / t_proc:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+# Benchmark: K-medias con el motor directo vs. el motor acelerado de Hamerly.
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.bench_k_medias_hamerly [filas] [dimensiones]
+import sys
+import time
+
+import numpy as np
+
+from nucleo.k_medias import KernelHamerly, KernelKMedias, ejecutar_k_medias, inicializar_kmeans_pp
+
+def generar_datos(n_filas, n_dim, n_grupos, semilla=0):
+    rng = np.random.default_rng(semilla)
+    centros = rng.normal(scale=5, size=(n_grupos, n_dim))
+    return centros[rng.integers(0, n_grupos, n_filas)] + rng.normal(size=(n_filas, n_dim))
+
+def medir(X, centroides, motor):
+    t0 = time.perf_counter()
+    resultado = ejecutar_k_medias(X, centroides, max_iter=50, motor=motor)
+    return time.perf_counter() - t0, resultado
+
+def main():
+    n_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_dim = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"filas={n_filas} dimensiones={n_dim}")
+    print(f"{'k':>4} {'iter':>5} {'directo (s)':>12} {'hamerly (s)':>12} {'speedup':>8} {'omitidas':>9}")
+    for k in (10, 20, 50):
+        X = generar_datos(n_filas, n_dim, k)
+        centroides = inicializar_kmeans_pp(X, k, np.random.default_rng(k))
+        t_directo, directo = medir(X, centroides, KernelKMedias)
+        t_hamerly, hamerly = medir(X, centroides, KernelHamerly)
+        assert all(np.array_equal(a['asign_idx'], b['asign_idx'])
+                   for a, b in zip(directo['historial'], hamerly['historial'])) \
+            and len(directo['historial']) == len(hamerly['historial']), \
+            "El motor de Hamerly difiere del directo"
+        totales = sum(h['distancias'] for h in directo['historial'])
+        calculadas = sum(h['distancias'] for h in hamerly['historial'])
+        print(f"{k:>4} {len(directo['historial']):>5} {t_directo:>12.3f} {t_hamerly:>12.3f} "
+              f"{t_directo / t_hamerly:>7.2f}x {100 * (1 - calculadas / totales):>8.1f}%")
+
+if __name__ == '__main__':
+    main()
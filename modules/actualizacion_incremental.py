@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.carga_datos import cargar_datos, clave_archivo
+from modules.fuentes import clave_fuente, elegir_fuente, rebobinar
+
+# Piezas de interfaz comunes a la regresión simple y a la múltiple. Lo propio de
+# cada modelo (núcleo, selección de columnas, formato de los estadísticos) lo
+# pasa cada página.
+
+def cargar_csv_por_bloques(clave, seleccionar_variables, estadisticos_por_bloques, guardar_resultado, etiqueta_boton):
+    # seleccionar_variables(columnas) -> (x, y_col) o None; x se pasa tal cual al núcleo
+    fuente, _ = elegir_fuente("Sube tu archivo CSV", ["csv"], clave)
+    if fuente is None:
+        st.info("Por favor, sube un archivo para continuar.")
+        return
+
+    try:
+        rebobinar(fuente)
+        columnas = pd.read_csv(fuente, nrows=0).columns.tolist()
+    except Exception as e:
+        st.error(f"Error leyendo el archivo: {e}")
+        return
+
+    variables = seleccionar_variables(columnas)
+    if variables is None:
+        return
+    x, y_col = variables
+
+    if st.button(etiqueta_boton):
+        try:
+            rebobinar(fuente)
+            est, vista = estadisticos_por_bloques(fuente, x, y_col)
+            guardar_resultado(est, x, y_col, clave_fuente(fuente), vista)
+        except Exception as e:
+            st.error(f"Error en el cálculo: {str(e)}")
+
+def mostrar_actualizacion(est, x_cols, y_col, clave, ajustar, exportar, importar, recalcular):
+    # ajustar(df) -> estadísticos de las filas nuevas; importar(bytes) -> (estadísticos, x_cols, y_col);
+    # recalcular(est) guarda en la sesión los coeficientes actualizados
+    st.markdown("### Actualización incremental")
+    aplicados = st.session_state.setdefault(f'deltas_aplicados_{clave}', set())
+
+    st.download_button("Descargar estadísticos (.json)", exportar,
+                       file_name=f"estadisticos_regresion_{clave}.json", mime="application/json")
+
+    delta = st.file_uploader("Sube un archivo solo con las filas nuevas (delta)", type=["csv", "xlsx"],
+                             key=f"delta_{clave}")
+    fragmento = st.file_uploader("…o estadísticos de otro fragmento (.json)", type=["json"],
+                                 key=f"fragmento_{clave}")
+    for nivel, mensaje in st.session_state.pop(f'mensajes_incremental_{clave}', []):
+        getattr(st, nivel)(mensaje)
+    if not st.button("Añadir al modelo", key=f"anadir_{clave}"):
+        return
+    mensajes = []
+    try:
+        for archivo in (delta, fragmento):
+            if archivo is None:
+                continue
+            clave_delta = clave_archivo(archivo)
+            if clave_delta in aplicados:
+                mensajes.append(('warning', f"'{archivo.name}' ya se había añadido; se omite."))
+                continue
+            if archivo is fragmento:
+                otro, x_otro, y_otro = importar(archivo.getvalue())
+                if (list(x_otro), y_otro) != (list(x_cols), y_col):
+                    mensajes.append(('error', f"El fragmento es de {', '.join(x_otro)} → {y_otro}, "
+                                              f"no de {', '.join(x_cols)} → {y_col}."))
+                    continue
+            else:
+                df_delta = cargar_datos(archivo, 'regresion')
+                faltantes = [c for c in list(x_cols) + [y_col] if c not in df_delta.columns]
+                if faltantes:
+                    mensajes.append(('error', f"Faltan columnas en el delta: {', '.join(faltantes)}"))
+                    continue
+                otro = ajustar(df_delta[list(x_cols) + [y_col]].dropna())
+            est.combinar(otro)
+            aplicados.add(clave_delta)
+            mensajes.append(('success', f"Añadidas {otro.n} filas desde '{archivo.name}' (total n = {est.n})."))
+        recalcular(est)
+    except np.linalg.LinAlgError:
+        mensajes.append(('error', "Error: La matriz X^T * X no es invertible. Puede haber multicolinealidad entre variables independientes."))
+    except Exception as e:
+        mensajes.append(('error', f"Error en la actualización: {str(e)}"))
+    # Se vuelve a ejecutar para que los resultados de arriba muestren los nuevos valores
+    st.session_state[f'mensajes_incremental_{clave}'] = mensajes
+    st.rerun()
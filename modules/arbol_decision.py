@@ -1,103 +1,57 @@
+import os
 import pandas as pd
-import numpy as np
 import streamlit as st
 from graphviz import Digraph
-import unicodedata
-
-# --- Normalización y limpieza ---
-def normalizar_texto(texto):
-    texto = str(texto).strip().lower()
-    texto = ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
-    return texto
-
-def corregir_errores_ortograficos(valor):
-    correcciones = {'ingnieria': 'ingenieria'}
-    return correcciones.get(valor, valor)
-
-def limpiar_y_normalizar_df(df, columnas):
-    for col in columnas:
-        df[col] = df[col].astype(str).apply(normalizar_texto)
-        df[col] = df[col].apply(corregir_errores_ortograficos)
-    return df
-
-# --- Cálculo de entropía ---
-def calcular_entropia(etiquetas, base=None):
-    valores, conteos = np.unique(etiquetas, return_counts=True)
-    probabilidades = conteos / conteos.sum()
-    k = base or len(valores)
-    ent = 0.0
-    for p in probabilidades:
-        if p > 0:
-            ent -= p * np.log(p) / np.log(k)
-    return ent
-
-# --- Entropía condicional estilo profesor ---
-def entropia_condicional(data, atributo, target, clases_global):
-    df = data[data[atributo] != '?']
-    valores, conteos = np.unique(df[atributo], return_counts=True)
+from modules.carga_datos import POLITICAS_NA, cargar_datos, cargar_derivado
+from modules.paginacion import seleccionar_ventana
+from modules.temporales import descartar, nuevo_resultado
+from nucleo.id3 import (CORRECCIONES_ORTOGRAFICAS, ajustar, clasificar_por_bloques, compilar_arbol,
+                        deserializar_modelo, extraer_reglas, leer_correcciones, predecir,
+                        preparar_datos, serializar_modelo, texto_camino)
+
+# --- Traza del cálculo (renderizado bajo demanda) ---
+def mostrar_calculo_entropia(detalle, k, expandido=False):
+    atributo = detalle['atributo']
+    conteos = detalle['conteos']
     n_total = conteos.sum()
-    k = len(clases_global)
-
-    with st.expander(f"🔍 Cálculo E(S|{atributo})", expanded=True):
+    with st.expander(f"🔍 Cálculo E(S|{atributo})", expanded=expandido):
         st.markdown(f"### Para '{atributo}':")
-        E_cond = 0.0
-        for v, c in zip(valores, conteos):
-            subset = df[df[atributo] == v][target]
-            n_sub = len(subset)
-            terminos = []
-            for cls in clases_global:
-                cnt = np.sum(subset == cls)
-                terminos.append(f"{cnt}/{n_sub}*LOG({cnt}/{n_sub};{k})")
-            formula = ' + '.join(terminos)
-            contrib = (c / n_total) * calcular_entropia(subset, base=k)
-            E_cond += contrib
+        for fila, contrib in zip(conteos, detalle['contribuciones']):
+            c = fila.sum()
+            formula = ' + '.join(f"{cnt}/{c}*LOG({cnt}/{c};{k})" for cnt in fila)
             st.code(f"= {c}/{n_total} * (-[{formula}]) = {contrib:.9f}", language='text')
-        st.markdown(f"**E(S|{atributo}) = {E_cond:.9f}**")
-    return E_cond
-
-# --- Nodo de decisión ---
-class NodoDecision:
-    def __init__(self, atributo=None, hijos=None, es_hoja=False, clase=None):
-        self.atributo = atributo
-        self.hijos = hijos or {}
-        self.es_hoja = es_hoja
-        self.clase = clase
-
-# --- Construcción recursiva ---
-def construir_arbol_interactivo(data, atributos, target, clases_global=None):
-    if clases_global is None:
-        clases_global = list(np.unique(data[target]))
-    df = data[data[target] != '?']
-    if df.empty:
+        st.markdown(f"**E(S|{atributo}) = {detalle['E']:.9f}**")
+
+def mostrar_nodo_traza(registro, k, expandido=False):
+    st.markdown(f"#### Nodo: {texto_camino(registro['camino'])} ({registro['n']} filas)")
+    if registro['n'] == 0:
         st.write("⚠️ No hay datos, asigno clase 'Desconocido'")
-        return NodoDecision(es_hoja=True, clase='Desconocido')
-
-    entropias = {attr: entropia_condicional(df, attr, target, clases_global) for attr in atributos}
-    mejor = min(entropias, key=entropias.get)
-    st.write(f"➡️ Mejor atributo = {mejor} (E(S|{mejor}) = {entropias[mejor]:.9f})\n")
-    nodo = NodoDecision(atributo=mejor)
-
-    for val in np.unique(df[mejor]):
-        subset = df[df[mejor] == val]
-        if len(subset[target].unique()) == 1:
-            clase_leaf = subset[target].iloc[0]
-            st.write(f"▷ Particionando {mejor} = {val} → Nodo hoja con clase: {clase_leaf}\n")
-            nodo.hijos[val] = NodoDecision(es_hoja=True, clase=clase_leaf)
+        return
+    if registro['mejor'] is None:
+        st.write(f"▷ Sin atributos restantes → Nodo hoja con clase mayoritaria: {registro['hoja']}")
+        return
+    for detalle in registro['entropias']:
+        mostrar_calculo_entropia(detalle, k, expandido)
+    mejor = registro['mejor']
+    E_mejor = next(d['E'] for d in registro['entropias'] if d['atributo'] == mejor)
+    st.write(f"➡️ Mejor atributo = {mejor} (E(S|{mejor}) = {E_mejor:.9f})")
+    for val, clase_leaf in registro['particiones']:
+        if clase_leaf is not None:
+            st.write(f"▷ Particionando {mejor} = {val} → Nodo hoja con clase: {clase_leaf}")
         else:
-            resto = [a for a in atributos if a != mejor]
-            nodo.hijos[val] = construir_arbol_interactivo(subset, resto, target, clases_global)
-    return nodo
-
-# --- Extracción de reglas ---
-def extraer_reglas(nodo, camino=None):
-    camino = camino or []
-    if nodo.es_hoja:
-        cond = ' y '.join(camino) if camino else '(sin condición)'
-        return [f"Si {cond}, entonces Categoría = {nodo.clase}"]
-    reglas = []
-    for v, h in nodo.hijos.items():
-        reglas.extend(extraer_reglas(h, camino + [f"{nodo.atributo} = {v}"]))
-    return reglas
+            st.write(f"▷ Particionando {mejor} = {val} → Subárbol")
+
+def mostrar_traza_paginada(traza, k, clave='traza'):
+    st.subheader("Traza del cálculo")
+    modo = st.radio("Mostrar traza", ("Por página", "Por nodo"), horizontal=True, key=f"{clave}_modo")
+    if modo == "Por nodo":
+        etiquetas = [f"{i + 1}. {texto_camino(r['camino'])}" for i, r in enumerate(traza)]
+        i = st.selectbox("Nodo", range(len(traza)), format_func=etiquetas.__getitem__, key=f"{clave}_nodo")
+        mostrar_nodo_traza(traza[i], k, expandido=True)
+        return
+    inicio, fin = seleccionar_ventana(len(traza), clave, tamanos=(5, 10, 25), etiqueta="Nodos por página")
+    for registro in traza[inicio:fin]:
+        mostrar_nodo_traza(registro, k)
 
 # --- Dibujo del árbol ---
 def dibujar_arbol(nodo, dot=None, padre=None, etiqueta=None, contador=[0]):
@@ -114,73 +68,59 @@ def dibujar_arbol(nodo, dot=None, padre=None, etiqueta=None, contador=[0]):
             dibujar_arbol(h, dot, nid, str(v), contador)
     return dot
 
-# --- Predicción ---
-def predecir(nodo, ejemplo):
-    if nodo.es_hoja:
-        return nodo.clase
-    val = ejemplo.get(nodo.atributo)
-    if val not in nodo.hijos:
-        val = next(iter(nodo.hijos))
-    return predecir(nodo.hijos[val], ejemplo)
-
 # --- App Streamlit ---
 def procesar_arbol_decision():
     st.title("🌳 Árbol ID3")
 
     uploaded = st.file_uploader("Sube CSV o Excel", type=["csv","xlsx"])
-    if not uploaded:
-        st.info("Por favor sube un archivo para continuar.")
-        return
-    try:
-        if uploaded.name.endswith(".csv"):
-            df = pd.read_csv(uploaded, na_values=["?","? "], keep_default_na=False)
-        else:
-            df = pd.read_excel(uploaded, na_values=["?","? "], keep_default_na=False)
-    except Exception as e:
-        st.error(f"Error cargando el archivo: {e}")
-        return
-
-    df = df.dropna(how='any')
-    df = limpiar_y_normalizar_df(df, df.columns.tolist())
-    st.session_state['df'] = df
-
-    st.subheader("Datos cargados")
-    st.dataframe(df)
-
-    cols = df.columns.tolist()
-    target = st.selectbox("Selecciona la variable a predecir", cols, index=0)
-    features = st.multiselect("Selecciona las variables de entrada", [c for c in cols if c != target])
-
-    if st.button("Generar árbol ID3"):
-        if not features:
-            st.error("Selecciona al menos una variable de entrada.")
+    with st.expander("Correcciones ortográficas"):
+        texto = st.text_area("Una corrección por línea (incorrecto=correcto)",
+                             '\n'.join(f"{k}={v}" for k, v in CORRECCIONES_ORTOGRAFICAS.items()))
+    correcciones = leer_correcciones(texto)
+
+    # Sin archivo de entrenamiento se puede cargar un modelo guardado y clasificar un lote
+    if uploaded:
+        df = entrenar_desde_archivo(uploaded, correcciones)
+    else:
+        df = None
+        st.info("Sube un archivo para construir el árbol o carga un modelo guardado.")
+
+    modelo_subido = st.file_uploader("O carga un modelo ID3 guardado (.json)", type=["json"], key='modelo_arbol')
+    if modelo_subido and st.session_state.get('modelo_cargado') != modelo_subido.name:
+        try:
+            modelo = deserializar_modelo(modelo_subido.getvalue())
+        except ValueError as e:
+            st.error(f"Error cargando el modelo: {e}")
             return
-        df_model = df[features + [target]].astype(str)
-        arbol = construir_arbol_interactivo(df_model, features, target)
-        st.session_state['arbol'] = arbol
-        st.session_state['reglas'] = extraer_reglas(arbol)
-        st.session_state['ok'] = True
-        st.session_state['features'] = features
-        st.session_state['target'] = target
+        guardar_modelo_en_sesion(modelo['arbol'], None, modelo['features'], modelo['target'], modelo['clases'])
+        st.session_state['modelo_cargado'] = modelo_subido.name
 
     if st.session_state.get('ok'):
         features = st.session_state['features']
         target = st.session_state['target']
-        df_model = st.session_state['df'][features + [target]].astype(str)
 
         st.success("Árbol construido correctamente.")
+        st.download_button("Descargar modelo (.json)",
+                           serializar_modelo(st.session_state['arbol'], features, target, st.session_state['clases']),
+                           file_name="modelo_id3.json", mime="application/json")
+        if st.session_state['traza'] is not None:
+            mostrar_traza_paginada(st.session_state['traza'], len(st.session_state['clases']))
+
         st.subheader("Reglas de Clasificación")
         for i, regla in enumerate(st.session_state['reglas'], 1):
             st.markdown(f"**Regla {i}:** {regla}")
 
         st.subheader("Diagrama del Árbol")
-        st.graphviz_chart(dibujar_arbol(st.session_state['arbol']))
+        st.graphviz_chart(st.session_state['dot'])
 
         st.subheader("Prueba de predicción")
         with st.form('form_pred'):
             ejemplo = {}
-            for c in features:
-                opts = sorted(set(df_model[c].unique()) | {'?'})
+            compilado = st.session_state['arbol_compilado']
+            for i, c in enumerate(features):
+                vistos = df[c].astype(str).unique() if df is not None and c in df.columns \
+                    else compilado.vocabularios[i]
+                opts = sorted(set(vistos) | {'?'})
                 ejemplo[c] = st.selectbox(c, opts, index=opts.index('?'))
             if st.form_submit_button('Predecir'):
                 pr = predecir(st.session_state['arbol'], ejemplo)
@@ -189,9 +129,84 @@ def procesar_arbol_decision():
                 else:
                     st.error("No se pudo predecir.")
 
+        mostrar_clasificacion_lotes(target, correcciones)
+
+def mostrar_clasificacion_lotes(target, correcciones):
+    st.subheader("Predicción por lotes")
+    lote = st.file_uploader("Sube un CSV o Excel con las variables de entrada", type=["csv","xlsx"],
+                            key='lote_arbol')
+    if st.button("Clasificar archivo", key='lote_arbol_boton'):
+        if lote is None:
+            st.warning("Sube un archivo.")
+            return
+        # Se reemplaza el resultado anterior de esta sesión
+        descartar(st.session_state.pop('lote_arbol_resultado', None))
+        destino = nuevo_resultado("predicciones_arbol_")
+        try:
+            lote.seek(0)
+            filas, segundos = clasificar_por_bloques(lote, lote.name, st.session_state['arbol_compilado'],
+                                                     correcciones, destino, f"Predicción {target}",
+                                                     na_values=POLITICAS_NA['arbol_decision'])
+        except Exception as e:
+            descartar(destino)
+            st.error(f"Error en la predicción por lotes: {e}")
+            return
+        velocidad = filas / segundos if segundos > 0 else float('inf')
+        st.success(f"{filas} filas clasificadas en {segundos:.2f} s ({velocidad:,.0f} filas/s).")
+        st.session_state['lote_arbol_resultado'] = destino
+
+    resultado = st.session_state.get('lote_arbol_resultado')
+    if resultado and os.path.exists(resultado):
+        st.dataframe(pd.read_csv(resultado, nrows=100))
+        with open(resultado, 'rb') as f:
+            st.download_button("Descargar predicciones (CSV)", f, file_name="predicciones_arbol.csv",
+                               mime="text/csv", key='lote_arbol_descarga')
+
+def entrenar_desde_archivo(uploaded, correcciones):
+    try:
+        cargar_datos(uploaded, 'arbol_decision')
+    except Exception as e:
+        st.error(f"Error cargando el archivo: {e}")
+        return None
+
+    # Limpieza y normalización una sola vez por archivo y correcciones, no en cada rerun;
+    # el frame se comparte entre sesiones y no se modifica
+    df = cargar_derivado(uploaded, 'arbol_decision', ('id3', tuple(sorted(correcciones.items()))),
+                         lambda vista: preparar_datos(vista, correcciones))
+
+    st.subheader("Datos cargados")
+    st.dataframe(df)
+
+    cols = df.columns.tolist()
+    target = st.selectbox("Selecciona la variable a predecir", cols, index=0)
+    features = st.multiselect("Selecciona las variables de entrada", [c for c in cols if c != target])
+    paralelo = st.checkbox("Evaluar atributos en paralelo (varios núcleos)", value=False)
+
+    if st.button("Generar árbol ID3"):
+        if not features:
+            st.error("Selecciona al menos una variable de entrada.")
+            return df
+        n_trabajadores = os.cpu_count() if paralelo else None
+        modelo = ajustar(df, features, target, n_trabajadores, usar_cache=True)
+        if modelo['desde_cache']:
+            st.info("Árbol recuperado de la caché (mismos datos y variables).")
+        guardar_modelo_en_sesion(modelo['arbol'], modelo['traza'], features, target, modelo['clases'])
+    return df
+
+def guardar_modelo_en_sesion(arbol, traza, features, target, clases):
+    st.session_state['arbol'] = arbol
+    st.session_state['traza'] = traza
+    st.session_state['clases'] = clases
+    st.session_state['reglas'] = extraer_reglas(arbol)
+    st.session_state['dot'] = dibujar_arbol(arbol)
+    st.session_state['arbol_compilado'] = compilar_arbol(arbol, features)
+    st.session_state['ok'] = True
+    st.session_state['features'] = features
+    st.session_state['target'] = target
+
 # Función run
 def run():
     procesar_arbol_decision()
 
 if __name__ == '__main__':
-    run()
+    run()
\ No newline at end of file
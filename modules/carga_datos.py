@@ -0,0 +1,153 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Valores que pandas interpreta como NA por defecto en read_csv/read_excel
+NA_DEFECTO = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+# Política de NA de cada algoritmo (equivalente a los na_values que usaba cada página)
+POLITICAS_NA = {
+    'arbol_decision': frozenset(['?', '? ']),
+    'regresion': NA_DEFECTO,
+    'k_medias': NA_DEFECTO | {'?'},
+    'k_modas': NA_DEFECTO | {'?'},
+}
+
+# Límite de memoria de la caché de archivos parseados (MB)
+LIMITE_CACHE_BYTES = int(os.environ.get("CACHE_DATOS_MB", "1024")) * 2**20
+MAX_CLAVES_ARCHIVO = 1024   # file_id recordados; los más antiguos se vuelven a hashear
+MAX_DERIVADOS = 4           # frames derivados por archivo (p. ej. distintas correcciones)
+
+_cache = OrderedDict()                # clave -> {'df', 'tamano', 'vistas', 'derivados'}
+_claves_por_archivo = OrderedDict()   # file_id de Streamlit -> clave, evita re-hashear en cada rerun
+_lock = threading.Lock()
+
+def clave_archivo(uploaded):
+    file_id = getattr(uploaded, 'file_id', None)
+    if file_id is not None:
+        with _lock:
+            clave = _claves_por_archivo.get(file_id)
+            if clave is not None:
+                _claves_por_archivo.move_to_end(file_id)
+                return clave
+    h = hashlib.sha256(uploaded.getvalue())
+    h.update(uploaded.name.rsplit('.', 1)[-1].lower().encode('utf-8'))
+    clave = h.hexdigest()
+    if file_id is not None:
+        with _lock:
+            _claves_por_archivo[file_id] = clave
+            while len(_claves_por_archivo) > MAX_CLAVES_ARCHIVO:
+                _claves_por_archivo.popitem(last=False)
+    return clave
+
+def _parsear(datos, nombre):
+    # Se parsea sin reconocer NA: cada política los aplica después sobre el mismo frame
+    buffer = io.BytesIO(datos)
+    if nombre.endswith(".csv"):
+        return pd.read_csv(buffer, keep_default_na=False)
+    return pd.read_excel(buffer, keep_default_na=False)
+
+def aplicar_politica_na(df, tokens):
+    vista = df.copy(deep=False)
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+            continue
+        mascara = serie.isin(tokens)
+        if not mascara.any():
+            continue
+        serie = serie.mask(mascara)
+        try:
+            # Igual que read_csv: si sin los NA la columna es numérica, se convierte
+            serie = pd.to_numeric(serie)
+        except (ValueError, TypeError):
+            pass
+        vista[col] = serie
+    return vista
+
+def _evictar():
+    total = sum(e['tamano'] for e in _cache.values())
+    while len(_cache) > 1 and total > LIMITE_CACHE_BYTES:
+        _, entrada = _cache.popitem(last=False)
+        total -= entrada['tamano']
+
+def _entrada(uploaded):
+    clave = clave_archivo(uploaded)
+    with _lock:
+        entrada = _cache.get(clave)
+        if entrada is not None:
+            _cache.move_to_end(clave)
+    if entrada is None:
+        df = _parsear(uploaded.getvalue(), uploaded.name)
+        entrada = {'df': df, 'tamano': int(df.memory_usage(deep=True).sum()), 'vistas': {},
+                   'derivados': OrderedDict()}
+        with _lock:
+            entrada = _cache.setdefault(clave, entrada)
+            _evictar()
+    return entrada
+
+def cargar_datos(uploaded, politica):
+    return _vista(_entrada(uploaded), politica)
+
+def cargar_derivado(uploaded, politica, clave, construir):
+    # construir(vista) se ejecuta una sola vez por archivo, política y clave; el resultado
+    # se comparte entre reruns y sesiones y se desaloja junto con el archivo
+    entrada = _entrada(uploaded)
+    with _lock:
+        guardado = entrada['derivados'].get((politica, clave))
+        if guardado is not None:
+            entrada['derivados'].move_to_end((politica, clave))
+    if guardado is not None:
+        return guardado[0]
+    df = construir(_vista(entrada, politica))
+    tamano = int(df.memory_usage(deep=True).sum())
+    with _lock:
+        guardado = entrada['derivados'].setdefault((politica, clave), (df, tamano))
+        if guardado[0] is df:
+            entrada['tamano'] += tamano
+            while len(entrada['derivados']) > MAX_DERIVADOS:
+                _, (_, viejo) = entrada['derivados'].popitem(last=False)
+                entrada['tamano'] -= viejo
+            _evictar()
+    return guardado[0]
+
+def _vista(entrada, politica):
+    vista = entrada['vistas'].get(politica)
+    if vista is None:
+        vista = aplicar_politica_na(entrada['df'], POLITICAS_NA[politica])
+        entrada['vistas'][politica] = vista
+    # Las vistas se comparten entre sesiones: las páginas no deben modificarlas in situ
+    return vista
+
+def obtener_datos(clave, politica):
+    # Acceso por clave para las sesiones que solo guardan la referencia al dataset;
+    # devuelve None si el archivo ya fue desalojado de la caché
+    with _lock:
+        entrada = _cache.get(clave)
+        if entrada is not None:
+            _cache.move_to_end(clave)
+    if entrada is None:
+        return None
+    return _vista(entrada, politica)
+
+def obtener_derivado(clave, politica, clave_derivado):
+    # Como obtener_datos, para un frame construido antes con cargar_derivado
+    with _lock:
+        entrada = _cache.get(clave)
+        guardado = entrada['derivados'].get((politica, clave_derivado)) if entrada is not None else None
+        if guardado is not None:
+            _cache.move_to_end(clave)
+            entrada['derivados'].move_to_end((politica, clave_derivado))
+    return None if guardado is None else guardado[0]
+
+def limpiar_cache():
+    with _lock:
+        _cache.clear()
+        _claves_por_archivo.clear()
@@ -0,0 +1,53 @@
+import hashlib
+import os
+
+import streamlit as st
+
+from modules.carga_datos import clave_archivo
+
+# Origen de los archivos de los modos por bloques. Un archivo subido lo guarda Streamlit
+# entero en memoria y lo limita a server.maxUploadSize (200 MB por defecto); para archivos
+# mayores el operador puede fijar un directorio de datos del servidor, del que el usuario
+# solo elige entre los archivos listados (nunca escribe una ruta).
+DIRECTORIO_DATOS = os.environ.get("DIRECTORIO_DATOS_APP")
+
+AYUDA_SUBIDA = ("El archivo subido se guarda completo en memoria y no puede superar "
+                "server.maxUploadSize (200 MB por defecto). Para archivos mayores, el "
+                "administrador puede configurar DIRECTORIO_DATOS_APP.")
+
+def archivos_del_servidor(tipos):
+    if not DIRECTORIO_DATOS:
+        return []
+    extensiones = tuple('.' + t for t in tipos)
+    try:
+        entradas = list(os.scandir(DIRECTORIO_DATOS))
+    except OSError:
+        return []
+    return sorted(e.name for e in entradas if e.is_file() and e.name.lower().endswith(extensiones))
+
+def elegir_fuente(etiqueta, tipos, clave):
+    # Devuelve (fuente, nombre): el archivo subido o la ruta de un archivo del directorio
+    # de datos, o (None, None) si todavía no hay ninguno
+    disponibles = archivos_del_servidor(tipos)
+    if disponibles:
+        origen = st.radio("Origen del archivo", ("Subir archivo", "Directorio de datos del servidor"),
+                          horizontal=True, key=f"{clave}_origen")
+        if origen != "Subir archivo":
+            nombre = st.selectbox("Archivo del servidor", disponibles, key=f"{clave}_servidor")
+            return os.path.join(DIRECTORIO_DATOS, nombre), nombre
+    subido = st.file_uploader(etiqueta, type=tipos, key=clave, help=AYUDA_SUBIDA)
+    if subido is None:
+        return None, None
+    return subido, subido.name
+
+def rebobinar(fuente):
+    # Las rutas se vuelven a abrir en cada lectura; los archivos subidos hay que rebobinarlos
+    if hasattr(fuente, 'seek'):
+        fuente.seek(0)
+
+def clave_fuente(fuente):
+    # Para archivos del servidor basta la ruta con su tamaño y fecha: no se lee el contenido
+    if hasattr(fuente, 'seek'):
+        return clave_archivo(fuente)
+    info = os.stat(fuente)
+    return hashlib.sha256(f"{fuente}|{info.st_size}|{info.st_mtime_ns}".encode('utf-8')).hexdigest()
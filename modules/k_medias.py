@@ -1,30 +1,25 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
-
-def euclidean_distance(a, b):
-    return np.linalg.norm(a - b, axis=1)
-
-def inicializar_centroides_por_clase(df_known, x_cols, cat_col):
-    clases = df_known[cat_col].unique()
-    centroides = []
-    for c in clases:
-        media = df_known.loc[df_known[cat_col] == c, x_cols].mean().values
-        centroides.append(media)
-    return np.vstack(centroides), np.array(clases)
-
-def inicializar_centroides_aleatorios(X_known, k):
-    idx = np.random.choice(len(X_known), k, replace=False)
-    return X_known[idx]
-
-def mostrar_grafica_pca(X, asign_idx, centroides, titulo):
-    if X.shape[1] < 2:
-        st.warning("PCA requiere al menos dos columnas numéricas para visualizar.")
-        return
-    pca = PCA(n_components=2)
-    X2 = pca.fit_transform(X)
+from modules.carga_datos import cargar_datos, clave_archivo, POLITICAS_NA
+from modules.fuentes import elegir_fuente, rebobinar
+from modules.paginacion import seleccionar_ventana
+from modules.temporales import descartar, nuevo_resultado
+from nucleo.k_medias import (KernelHamerly, KernelKMedias, ajustar, barrido_k, ejecutar_por_bloques,
+                             euclidean_distance, imputar_por_centroides, inicializar_centroides_por_clase,
+                             proyectar_pca, resumen_iteraciones)
+# matplotlib se importa dentro de las funciones que lo usan: solo hace falta para las
+# gráficas y domina el tiempo de carga de la página
+
+MOTORES = {
+    "Directo (todas las distancias)": KernelKMedias,
+    "Hamerly (cotas por desigualdad triangular)": KernelHamerly,
+}
+
+def mostrar_grafica_pca(pca, X2, asign_idx, centroides, titulo):
+    import matplotlib.pyplot as plt
     C2 = pca.transform(centroides)
 
     plt.figure(figsize=(7,5))
@@ -38,9 +33,95 @@ def mostrar_grafica_pca(X, asign_idx, centroides, titulo):
     st.pyplot(plt)
     plt.close()
 
+# Mismos valores NA que la carga en memoria (política 'k_medias')
+_NA_CSV = dict(keep_default_na=False, na_values=sorted(POLITICAS_NA['k_medias']))
+
+def k_medias_por_bloques():
+    fuente, _ = elegir_fuente("Sube tu archivo CSV", ["csv"], "csv_bloques_k_medias")
+    if fuente is None:
+        st.info("Por favor, sube un archivo para continuar.")
+        return
+
+    try:
+        rebobinar(fuente)
+        # Los tipos se deducen de las primeras filas
+        cabecera = pd.read_csv(fuente, nrows=1000, **_NA_CSV)
+    except Exception as e:
+        st.error(f"Error leyendo el archivo: {e}")
+        return
+
+    num_cols = [c for c in cabecera.columns if pd.api.types.is_numeric_dtype(cabecera[c])]
+    x_cols = st.multiselect("Selecciona columnas numéricas para clustering", num_cols, default=num_cols,
+                            key="x_cols_bloques_k_medias")
+    if len(x_cols) < 1:
+        st.warning("Selecciona al menos una columna numérica.")
+        return
+
+    cat_col = "Clase" if "Clase" in cabecera.columns else None
+    k, semilla = 0, 0
+    if cat_col:
+        st.markdown(f"### Usando columna categórica para inicializar centroides: **{cat_col}**")
+    else:
+        st.info("No se encontró columna 'Clase': centroides iniciales con k-means++ sobre el primer bloque")
+        col1, col2 = st.columns(2)
+        k = int(col1.number_input("Número de clusters (k)", min_value=1, value=2, key="k_bloques_k_medias"))
+        semilla = int(col2.number_input("Semilla", min_value=0, value=0, key="semilla_bloques_k_medias"))
+    tam_lote = int(st.number_input("Tamaño del mini-lote", min_value=16, value=1024, step=256,
+                                   key="lote_k_medias"))
+
+    if st.button("Ejecutar K-medias por bloques"):
+        # Se reemplaza el resultado anterior de esta sesión
+        anterior = st.session_state.pop('k_medias_bloques', None)
+        if anterior:
+            descartar(anterior['destino'])
+        destino = nuevo_resultado("k_medias_")
+        try:
+            resultado = ejecutar_por_bloques(fuente, x_cols, cat_col, k, tam_lote, destino, semilla=semilla,
+                                             na_values=POLITICAS_NA['k_medias'])
+        except Exception as e:
+            descartar(destino)
+            st.error(f"Error en el cálculo: {e}")
+            return
+        resultado.update({'destino': destino, 'x_cols': x_cols})
+        st.session_state['k_medias_bloques'] = resultado
+
+    resultado = st.session_state.get('k_medias_bloques')
+    if not resultado or resultado['x_cols'] != x_cols:
+        return
+    velocidad = resultado['filas'] / resultado['segundos'] if resultado['segundos'] > 0 else float('inf')
+    st.success(f"{resultado['filas']} filas completas en {resultado['segundos']:.2f} s "
+               f"({velocidad:,.0f} filas/s).")
+
+    cent_df = pd.DataFrame(resultado['centroides'], columns=x_cols)
+    cent_df["Cluster"] = resultado['clases']
+    st.markdown("### Centroides")
+    st.dataframe(cent_df.round(2))
+
+    brecha = (resultado['inercia_minibatch'] / resultado['inercia_completo'] - 1) * 100 \
+        if resultado['inercia_completo'] > 0 else 0.0
+    st.markdown(f"### Calidad frente a K-medias completo (muestra de {resultado['muestra']} filas)")
+    st.dataframe(pd.DataFrame({
+        "Método": ["Mini-batch", "Completo"],
+        "Inercia": [resultado['inercia_minibatch'], resultado['inercia_completo']],
+    }).round(4))
+    st.markdown(f"Brecha de inercia: **{brecha:.2f}%**")
+
+    if os.path.exists(resultado['destino']):
+        with open(resultado['destino'], 'rb') as f:
+            st.download_button("Descargar asignaciones (CSV)", f, file_name="k_medias_asignaciones.csv",
+                               mime="text/csv", key="k_medias_descarga")
+
 def procesar_k_medias():
     st.title("🧠 K-medias")
 
+    modo = st.radio("Modo de cálculo", ("En memoria", "Mini-batch por bloques (CSV grandes)"),
+                    horizontal=True, key="modo_k_medias")
+    if modo == "En memoria":
+        k_medias_en_memoria()
+    else:
+        k_medias_por_bloques()
+
+def k_medias_en_memoria():
     # 1) Carga de datos
     uploaded = st.file_uploader("Sube CSV o Excel", type=["csv","xlsx"])
     if not uploaded:
@@ -48,10 +129,7 @@ def procesar_k_medias():
         return
 
     try:
-        if uploaded.name.endswith(".csv"):
-            df = pd.read_csv(uploaded, na_values=["?"])
-        else:
-            df = pd.read_excel(uploaded, na_values=["?"])
+        df = cargar_datos(uploaded, 'k_medias')
     except Exception as e:
         st.error(f"Error cargando el archivo: {e}")
         return
@@ -76,8 +154,14 @@ def procesar_k_medias():
         st.markdown(f"### Usando columna categórica para inicializar centroides: **{cat_col}**")
         k = df[cat_col].nunique()
     else:
-        st.info("No se encontró columna 'Clase', inicializando aleatoriamente k=2")
-        k = 2
+        st.info("No se encontró columna 'Clase': centroides iniciales con k-means++ y varios reinicios")
+        col1, col2, col3 = st.columns(3)
+        k = int(col1.number_input("Número de clusters (k)", min_value=1, value=2, key="k_k_medias"))
+        n_reinicios = int(col2.number_input("Reinicios", min_value=1, value=10, key="reinicios_k_medias"))
+        semilla = int(col3.number_input("Semilla", min_value=0, value=0, key="semilla_k_medias"))
+        paralelo = st.checkbox("Ejecutar reinicios en paralelo (varios núcleos)", value=False,
+                               key="paralelo_k_medias")
+        n_trabajadores = os.cpu_count() if paralelo else None
 
     # 4) Separar filas completas y faltantes
     mask_known = df[x_cols].notna().all(axis=1)
@@ -85,75 +169,136 @@ def procesar_k_medias():
     df_missing = df.loc[~mask_known].copy()
 
     X_known = df_known[x_cols].to_numpy()
+    if len(X_known) == 0:
+        st.error("No hay filas completas en las columnas seleccionadas.")
+        return
 
-    # 5) Inicializar centroides
-    if cat_col:
-        centroides, clases = inicializar_centroides_por_clase(df_known, x_cols, cat_col)
-    else:
-        centroides = inicializar_centroides_aleatorios(X_known, k)
-        clases = np.arange(k)
-
-    asign_prev = None
-    convergencia = False
     max_iter = 20
+    nombre_motor = st.selectbox("Motor de asignación", list(MOTORES), key="motor_k_medias")
+    motor = MOTORES[nombre_motor]
+    if not cat_col:
+        if k > len(X_known):
+            st.error(f"k no puede superar el número de filas completas ({len(X_known)}).")
+            return
+        mostrar_barrido_k(X_known, (clave_archivo(uploaded), tuple(x_cols)), semilla, max_iter,
+                          n_trabajadores)
 
-    # 6) Iteraciones de K-medias
-    for it in range(1, max_iter+1):
-        dist = np.vstack([euclidean_distance(X_known, c) for c in centroides]).T  # n×k
-        asign_idx = np.argmin(dist, axis=1)
-        asign = clases[asign_idx]
-
-        # Tabla de distancias y asignaciones
-        tabla = df_known[x_cols].reset_index(drop=True)
-        for j,c in enumerate(clases):
-            tabla[f"Distancia Cluster {c}"] = dist[:,j].round(2)
-        tabla["Cluster Más Cercano"] = asign
-        st.markdown(f"## Iteración {it}")
-        st.dataframe(tabla)
-
-        # Tabla de centroides
-        cent_df = pd.DataFrame(centroides, columns=x_cols)
-        cent_df["Cluster"] = clases
-        st.markdown("### Centroides")
-        st.dataframe(cent_df.round(2))
-
-        # Gráfica PCA
-        if len(x_cols) >= 2:
-            mostrar_grafica_pca(X_known, asign_idx, centroides, f"Clusters iteración {it}")
-
-        # Verificar convergencia
-        if asign_prev is not None and np.array_equal(asign_idx, asign_prev):
-            st.success(f"Convergencia alcanzada en iteración {it}")
-            convergencia = True
-            break
-
-        asign_prev = asign_idx.copy()
+    # 5) y 6) Inicialización e iteraciones de K-medias: se ejecutan sin interfaz y el
+    # resultado se guarda en la sesión, así abrir el detalle de una iteración no repite el clustering
+    firma = (clave_archivo(uploaded), tuple(x_cols), cat_col, nombre_motor) + \
+        (() if cat_col else (k, n_reinicios, semilla))
+    guardado = st.session_state.get('k_medias')
+    if guardado is None or guardado['firma'] != firma:
+        if cat_col:
+            centroides, clases = inicializar_centroides_por_clase(df_known, x_cols, cat_col)
+            resultado_km = ajustar(X_known, centroides=centroides, max_iter=max_iter, motor=motor)
+        else:
+            resultado_km = ajustar(X_known, k, n_reinicios=n_reinicios, semilla=semilla, max_iter=max_iter,
+                                   n_trabajadores=n_trabajadores, motor=motor)
+            clases = np.arange(k)
+        guardado = {'firma': firma, 'resultado': resultado_km, 'clases': clases, 'pca': None}
+        st.session_state['k_medias'] = guardado
+    resultado_km = guardado['resultado']
+    clases = guardado['clases']
+    historial = resultado_km['historial']
+    centroides = resultado_km['centroides']
+    asign = clases[resultado_km['asign_idx']]
 
-        # Recalcular centroides
-        nuevos = []
-        for j in range(len(centroides)):
-            pts = X_known[asign_idx == j]
-            nuevos.append(pts.mean(axis=0) if len(pts)>0 else centroides[j])
-        centroides = np.vstack(nuevos)
+    if resultado_km['inercias'] is not None:
+        inercias = resultado_km['inercias']
+        mejor = int(np.argmin(inercias))
+        st.markdown(f"Mejor de {len(inercias)} reinicios: **#{mejor + 1}** "
+                    f"(inercia final {inercias[mejor]:.4f})")
 
-    if not convergencia:
+    st.markdown("## Iteraciones")
+    st.dataframe(resumen_iteraciones(historial).round(4))
+    if resultado_km['convergencia']:
+        st.success(f"Convergencia alcanzada en iteración {len(historial)}")
+    else:
         st.warning(f"No se alcanzó convergencia en {max_iter} iteraciones.")
 
-    # 7) Imputar valores faltantes (con sus clases)
-    if cat_col and not df_missing.empty:
-        mapa = {c: centroides[i] for i,c in enumerate(clases)}
-        df_missing = df_missing.copy()
-        df_missing["Cluster asignado"] = df_missing[cat_col]
-        for col in x_cols:
-            df_missing[col] = df_missing["Cluster asignado"].map(lambda cl: mapa[cl][x_cols.index(col)])
+    mostrar_detalle_iteracion(historial, df_known, X_known, x_cols, clases, guardado)
+
+    # 7) Imputar valores faltantes: cada fila incompleta va al centroide más cercano en sus
+    # dimensiones observadas y solo se rellenan sus celdas vacías
+    if not df_missing.empty:
+        respaldo = int(np.bincount(resultado_km['asign_idx'], minlength=len(clases)).argmax())
+        asign_missing, X_imputado = imputar_por_centroides(df_missing[x_cols].to_numpy(dtype=float),
+                                                           centroides, respaldo)
+        df_missing[x_cols] = X_imputado
+        df_missing["Cluster asignado"] = clases[asign_missing]
         st.markdown("### Imputación de datos faltantes")
-        st.dataframe(df_missing[[*x_cols, cat_col, "Cluster asignado"]].round(2))
+        columnas = [*x_cols, *([cat_col] if cat_col else []), "Cluster asignado"]
+        inicio, fin = seleccionar_ventana(len(df_missing), "k_medias_imputacion")
+        st.dataframe(df_missing[columnas].iloc[inicio:fin].round(2))
 
     # 8) Resultado final
     df_known["Cluster asignado"] = asign
     resultado = pd.concat([df_known, df_missing], axis=0)
     st.markdown("### Resultado final")
-    st.dataframe(resultado.reset_index(drop=True).round(2))
+    inicio, fin = seleccionar_ventana(len(resultado), "k_medias_resultado")
+    st.dataframe(resultado.iloc[inicio:fin].reset_index(drop=True).round(2))
+
+def mostrar_barrido_k(X_known, firma, semilla, max_iter, n_trabajadores):
+    with st.expander("Barrido de k (codo y silueta)"):
+        col1, col2, col3 = st.columns(3)
+        k_min = int(col1.number_input("k mínimo", min_value=1, value=2, key="barrido_k_min"))
+        k_max = int(col2.number_input("k máximo", min_value=1, value=10, key="barrido_k_max"))
+        tam_muestra = int(col3.number_input("Tamaño de la muestra", min_value=100, value=5000,
+                                            key="barrido_muestra"))
+        if st.button("Calcular barrido de k"):
+            st.session_state['barrido_k_medias'] = (firma, barrido_k(
+                X_known, range(k_min, k_max + 1), semilla=semilla, tam_muestra=tam_muestra,
+                max_iter=max_iter, n_trabajadores=n_trabajadores))
+
+        guardado = st.session_state.get('barrido_k_medias')
+        if guardado is None or guardado[0] != firma or guardado[1].empty:
+            return
+        barrido = guardado[1]
+        st.dataframe(barrido.round(4))
+        import matplotlib.pyplot as plt
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
+        ax1.plot(barrido["k"], barrido["Inercia"], marker='o')
+        ax1.set_title("Codo")
+        ax1.set_xlabel("k")
+        ax1.set_ylabel("Inercia")
+        ax2.plot(barrido["k"], barrido["Silueta"], marker='o')
+        ax2.set_title("Silueta")
+        ax2.set_xlabel("k")
+        ax1.grid(True)
+        ax2.grid(True)
+        st.pyplot(fig)
+        plt.close(fig)
+
+def mostrar_detalle_iteracion(historial, df_known, X_known, x_cols, clases, guardado):
+    # Las tablas y la gráfica de una iteración solo se construyen cuando se piden
+    it = st.selectbox("Ver detalle de la iteración", [h['iteracion'] for h in historial],
+                      index=len(historial) - 1, key="k_medias_iteracion")
+    paso = historial[it - 1]
+    asign_idx = paso['asign_idx']
+    centroides = paso['centroides']
+
+    if st.checkbox("Mostrar tabla de distancias y asignaciones", key="k_medias_tabla"):
+        inicio, fin = seleccionar_ventana(len(X_known), "k_medias_distancias")
+        tabla = df_known[x_cols].iloc[inicio:fin].reset_index(drop=True)
+        for j,c in enumerate(clases):
+            tabla[f"Distancia Cluster {c}"] = euclidean_distance(X_known[inicio:fin], centroides[j]).round(2)
+        tabla["Cluster Más Cercano"] = clases[asign_idx[inicio:fin]]
+        st.dataframe(tabla)
+
+    if st.checkbox("Mostrar centroides", key="k_medias_centroides"):
+        cent_df = pd.DataFrame(centroides, columns=x_cols)
+        cent_df["Cluster"] = clases
+        st.dataframe(cent_df.round(2))
+
+    if st.checkbox("Mostrar gráfica PCA", key="k_medias_pca"):
+        if len(x_cols) < 2:
+            st.warning("PCA requiere al menos dos columnas numéricas para visualizar.")
+        else:
+            if guardado['pca'] is None:
+                guardado['pca'] = proyectar_pca(X_known)
+            pca, X2 = guardado['pca']
+            mostrar_grafica_pca(pca, X2, asign_idx, centroides, f"Clusters iteración {it}")
 
 def run():
     procesar_k_medias()
@@ -3,22 +3,10 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-
-def contar_modas_por_cluster(df_known, cat_col, clase_col):
-    clases = df_known[clase_col].unique()
-    valores = df_known[cat_col].unique()
-    conteo = pd.DataFrame(index=valores, columns=clases).fillna(0)
-
-    for c in clases:
-        subset = df_known.loc[df_known[clase_col] == c, cat_col]
-        conteo[c] = subset.value_counts()
-
-    conteo = conteo.fillna(0).astype(int)
-    modas = {c: conteo[c].idxmax() for c in clases}
-    return conteo, modas
-
-def diferencia_binaria(a, b):
-    return 0 if a == b else 1
+from modules.carga_datos import cargar_datos, clave_archivo
+from modules.paginacion import seleccionar_ventana
+from nucleo.k_modas import (ajustar, codificar_columnas, distancias_hamming, es_categorica,
+                            imputar_por_modas, modas_a_tabla, resumen_iteraciones)
 
 def procesar_k_modas():
     st.title("✨ K-modas ")
@@ -29,10 +17,7 @@ def procesar_k_modas():
         return
 
     try:
-        if uploaded.name.endswith(".csv"):
-            df = pd.read_csv(uploaded, na_values=["?"])
-        else:
-            df = pd.read_excel(uploaded, na_values=["?"])
+        df = cargar_datos(uploaded, 'k_modas')
     except Exception as e:
         st.error(f"Error cargando el archivo: {e}")
         return
@@ -40,95 +25,107 @@ def procesar_k_modas():
     st.subheader("Vista previa del dataset")
     st.dataframe(df)
 
-    cat_cols = [c for c in df.columns if pd.api.types.is_object_dtype(df[c]) or pd.api.types.is_categorical_dtype(df[c])]
+    clase_col = "Clase" if "Clase" in df.columns else None
+    if not clase_col:
+        st.error("No se encontró columna 'Clase' para definir clusters.")
+        return
+
+    cat_cols = [c for c in df.columns if es_categorica(df[c])]
+    candidatas = [c for c in cat_cols if c != clase_col]
     if not cat_cols:
         st.error("No se encontraron columnas categóricas para clustering.")
         return
 
-    cat_col = st.selectbox("Selecciona la columna categórica para clusterizar", cat_cols)
-    clase_col = "Clase" if "Clase" in df.columns else None
-    if not clase_col:
-        st.error("No se encontró columna 'Clase' para definir clusters.")
+    atributos = st.multiselect("Selecciona las columnas categóricas para clusterizar", cat_cols,
+                               default=candidatas or cat_cols)
+    if not atributos:
+        st.warning("Selecciona al menos una columna categórica.")
         return
 
     k = df[clase_col].nunique()
     st.markdown(f"Clusters detectados (según columna '{clase_col}'): **{k}**")
 
-    mask_known = df[[cat_col, clase_col]].notna().all(axis=1)
+    mask_known = df[[*atributos, clase_col]].notna().all(axis=1)
     df_known = df.loc[mask_known].copy()
     df_missing = df.loc[~mask_known].copy()
+    if df_known.empty:
+        st.error("No hay filas completas en las columnas seleccionadas.")
+        return
 
-    conteo, modas = contar_modas_por_cluster(df_known, cat_col, clase_col)
-
-    st.markdown("### Conteo de valores por cluster (Inicial)")
-    st.dataframe(conteo)
-
-    st.markdown("### Modas iniciales por cluster")
-    modas_df = pd.DataFrame.from_dict(modas, orient='index', columns=[cat_col])
-    modas_df.index.name = "Cluster"
-    st.dataframe(modas_df)
-
-    asign_prev = None
-    convergencia = False
     max_iter = 20
-    clases = list(modas.keys())
-
-    for it in range(1, max_iter+1):
-        distancias = []
-        for c in clases:
-            modo_c = modas[c]
-            dist_c = df_known.apply(lambda row:
-                diferencia_binaria(row[cat_col], modo_c) + diferencia_binaria(row[clase_col], c),
-                axis=1)
-            distancias.append(dist_c.values)
-        dist_arr = np.vstack(distancias).T
-
-        asign_idx = np.argmin(dist_arr, axis=1)
-        asign = [clases[i] for i in asign_idx]
-
-        tabla = pd.DataFrame({cat_col: df_known[cat_col], clase_col: df_known[clase_col]})
-        for j, c in enumerate(clases):
-            tabla[f"Distancia Cluster {c}"] = dist_arr[:, j]
-        tabla["Cluster Más Cercano"] = asign
 
-        st.markdown(f"## Iteración {it}")
-        st.dataframe(tabla)
+    # Las modas iniciales salen de las tablas de frecuencia por 'Clase'; el modelo se
+    # guarda en la sesión para no repetir el clustering en cada interacción
+    firma = (clave_archivo(uploaded), tuple(atributos))
+    guardado = st.session_state.get('k_modas')
+    if guardado is None or guardado['firma'] != firma:
+        guardado = {'firma': firma, 'resultado': ajustar(df_known, atributos, clase_col, max_iter)}
+        st.session_state['k_modas'] = guardado
+    resultado_km = guardado['resultado']
+    categorias = resultado_km['categorias']
+    clases = resultado_km['clases']
+    historial = resultado_km['historial']
 
-        modas_df = pd.DataFrame.from_dict(modas, orient='index', columns=[cat_col])
-        modas_df.index.name = "Cluster"
-        st.markdown("### Modas (centroides) actuales")
-        st.dataframe(modas_df)
+    st.markdown("### Conteo de valores por cluster (Inicial)")
+    mostrar_conteo(resultado_km['iniciales'], atributos, categorias, clases, "inicial")
 
-        if asign_prev is not None and asign == asign_prev:
-            st.success(f"Convergencia alcanzada en iteración {it}")
-            convergencia = True
-            break
+    st.markdown("### Modas iniciales por cluster")
+    st.dataframe(modas_a_tabla(historial[0]['modas_cod'], categorias, atributos, clases))
 
-        asign_prev = asign.copy()
+    st.markdown("## Iteraciones")
+    st.dataframe(resumen_iteraciones(historial))
+    if resultado_km['convergencia']:
+        st.success(f"Convergencia alcanzada en iteración {len(historial)}")
+    else:
+        st.warning(f"No se alcanzó convergencia en {max_iter} iteraciones.")
 
-        df_known["Cluster Temporal"] = asign
-        conteo, nuevas_modas = contar_modas_por_cluster(df_known, cat_col, clase_col)
-        modas = nuevas_modas
-        df_known.drop(columns=["Cluster Temporal"], inplace=True)
+    mostrar_detalle_iteracion(historial, df_known, atributos, categorias, clases)
 
-        if it == 2:
-            st.markdown("### Conteo de valores por cluster (Iteración 2)")
-            st.dataframe(conteo)
+    if resultado_km['tablas'] is not None and st.checkbox("Mostrar conteo de valores por cluster (final)",
+                                                         key="k_modas_conteo_final"):
+        mostrar_conteo(resultado_km['tablas'], atributos, categorias, clases, "final")
 
-    if not convergencia:
-        st.warning(f"No se alcanzó convergencia en {max_iter} iteraciones.")
+    modas_cod = resultado_km['modas_cod']
+    asign = clases[resultado_km['asign_idx']]
 
     if not df_missing.empty:
-        df_missing = df_missing.copy()
-        df_missing["Cluster asignado"] = df_missing[clase_col]
-        df_missing[cat_col] = df_missing["Cluster asignado"].map(modas)
+        respaldo = int(np.bincount(resultado_km['asign_idx'], minlength=len(clases)).argmax())
+        df_missing, asign_missing = imputar_por_modas(df_missing, atributos, categorias, modas_cod, respaldo)
+        df_missing["Cluster asignado"] = clases[asign_missing]
         st.markdown("### Imputación de datos faltantes")
-        st.dataframe(df_missing[[cat_col, clase_col, "Cluster asignado"]])
+        columnas = [*atributos, *([] if clase_col in atributos else [clase_col]), "Cluster asignado"]
+        inicio, fin = seleccionar_ventana(len(df_missing), "k_modas_imputacion")
+        st.dataframe(df_missing[columnas].iloc[inicio:fin])
 
     df_known["Cluster asignado"] = asign
     resultado = pd.concat([df_known, df_missing], axis=0)
     st.markdown("### Resultado final")
-    st.dataframe(resultado.reset_index(drop=True))
+    inicio, fin = seleccionar_ventana(len(resultado), "k_modas_resultado")
+    st.dataframe(resultado.iloc[inicio:fin].reset_index(drop=True))
+
+def mostrar_conteo(tablas, atributos, categorias, clases, clave):
+    j = atributos.index(st.selectbox("Atributo", atributos, key=f"k_modas_conteo_{clave}"))
+    inicio, fin = seleccionar_ventana(len(categorias[j]), f"k_modas_conteo_{clave}_filas")
+    st.dataframe(pd.DataFrame(tablas.ventana(j, inicio, fin), index=categorias[j][inicio:fin], columns=clases))
+
+def mostrar_detalle_iteracion(historial, df_known, atributos, categorias, clases):
+    # La tabla de distancias de una iteración solo se construye cuando se pide
+    it = st.selectbox("Ver detalle de la iteración", [h['iteracion'] for h in historial],
+                      index=len(historial) - 1, key="k_modas_iteracion")
+    paso = historial[it - 1]
+
+    st.markdown("### Modas (centroides) de la iteración")
+    st.dataframe(modas_a_tabla(paso['modas_cod'], categorias, atributos, clases))
+
+    if st.checkbox("Mostrar tabla de distancias y asignaciones", key="k_modas_tabla"):
+        inicio, fin = seleccionar_ventana(len(df_known), "k_modas_distancias")
+        ventana = df_known.iloc[inicio:fin]
+        dist = distancias_hamming(codificar_columnas(ventana, atributos, categorias), paso['modas_cod'])
+        tabla = ventana[atributos].reset_index(drop=True)
+        for j, c in enumerate(clases):
+            tabla[f"Distancia Cluster {c}"] = dist[:, j]
+        tabla["Cluster Más Cercano"] = clases[paso['asign_idx'][inicio:fin]]
+        st.dataframe(tabla)
 
 def run():
     procesar_k_modas()
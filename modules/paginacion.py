@@ -0,0 +1,13 @@
+import streamlit as st
+
+def seleccionar_ventana(total, clave, tamanos=(50, 200, 1000), etiqueta="Filas por página"):
+    # Dibuja los controles de paginación y devuelve el rango [inicio, fin) a mostrar
+    if total == 0:
+        return 0, 0
+    col_tam, col_pag = st.columns(2)
+    por_pagina = col_tam.selectbox(etiqueta, tamanos, key=f"{clave}_tam")
+    n_paginas = max(1, -(-total // por_pagina))
+    pagina = col_pag.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas,
+                                  value=1, step=1, key=f"{clave}_pagina")
+    inicio = (min(pagina, n_paginas) - 1) * por_pagina
+    return inicio, min(inicio + por_pagina, total)
@@ -0,0 +1,37 @@
+import os
+
+import streamlit as st
+
+from modules.fuentes import elegir_fuente, rebobinar
+from modules.temporales import descartar, nuevo_resultado
+from nucleo.prediccion_lotes import predecir_por_bloques
+
+def mostrar_prediccion_lotes(x_cols, beta, y_col, clave):
+    st.markdown("### Predicción por lotes")
+    archivo, nombre = elegir_fuente("Sube un CSV o Excel con las variables independientes", ["csv", "xlsx"],
+                                    f"{clave}_archivo")
+
+    if st.button("Predecir archivo", key=f"{clave}_boton"):
+        if archivo is None:
+            st.warning("Sube un archivo.")
+            return
+        # Se reemplaza el resultado anterior de esta sesión
+        descartar(st.session_state.pop(f"{clave}_resultado", None))
+        destino = nuevo_resultado("predicciones_")
+        try:
+            rebobinar(archivo)
+            filas, segundos = predecir_por_bloques(archivo, nombre, x_cols, beta, destino,
+                                                   f"Predicción {y_col}")
+        except Exception as e:
+            descartar(destino)
+            st.error(f"Error en la predicción por lotes: {e}")
+            return
+        velocidad = filas / segundos if segundos > 0 else float('inf')
+        st.success(f"{filas} filas en {segundos:.2f} s ({velocidad:,.0f} filas/s).")
+        st.session_state[f"{clave}_resultado"] = destino
+
+    resultado = st.session_state.get(f"{clave}_resultado")
+    if resultado and os.path.exists(resultado):
+        with open(resultado, 'rb') as f:
+            st.download_button("Descargar predicciones (CSV)", f, file_name="predicciones.csv",
+                               mime="text/csv", key=f"{clave}_descarga")
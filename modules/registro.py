@@ -0,0 +1,30 @@
+import importlib
+import sys
+import time
+
+# Módulo de cada página de algoritmo: solo se importa cuando se selecciona,
+# así abrir una explicación no carga sklearn, matplotlib ni graphviz
+ALGORITMOS = {
+    "Árbol de Decisión": "modules.arbol_decision",
+    "Regresión Lineal": "modules.regresion_lineal",
+    "Regresión Múltiple": "modules.regresion_multiple",
+    "K-medias": "modules.k_medias",
+    "K-modas": "modules.k_modas",
+}
+
+_tiempos = {}   # módulo -> (segundos, módulos nuevos) de su primera importación en el proceso
+
+def cargar_algoritmo(nombre):
+    ruta = ALGORITMOS[nombre]
+    modulo = sys.modules.get(ruta)
+    if modulo is None:
+        antes = len(sys.modules)
+        inicio = time.perf_counter()
+        modulo = importlib.import_module(ruta)
+        _tiempos[ruta] = (time.perf_counter() - inicio, len(sys.modules) - antes)
+    return modulo
+
+def tiempos_importacion():
+    # Coste marginal: lo que ya cargó una página anterior no se vuelve a contar
+    return [{"Módulo": ruta, "Segundos": round(segundos, 3), "Módulos nuevos": nuevos}
+            for ruta, (segundos, nuevos) in _tiempos.items()]
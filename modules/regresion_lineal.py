@@ -1,85 +1,98 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from modules.actualizacion_incremental import cargar_csv_por_bloques, mostrar_actualizacion
+from modules.carga_datos import cargar_datos, cargar_derivado, clave_archivo, obtener_datos, obtener_derivado
+from modules.paginacion import seleccionar_ventana
+from modules.prediccion_lotes import mostrar_prediccion_lotes
+from nucleo.regresion_lineal import (ajustar, comomentos_por_bloques, estadisticos_de_par,
+                                     estadisticos_por_bloques, exportar_estadisticos, importar_estadisticos,
+                                     matrices_pares, predecir, tabla_pasos, traza)
+
+def cargar_todos_los_pares():
+    uploaded_file = st.file_uploader("Sube tu archivo CSV o Excel", type=["csv", "xlsx"], key="archivo_pares")
+    if uploaded_file is None:
+        st.info("Por favor, sube un archivo para continuar.")
+        return
+    try:
+        df = cargar_datos(uploaded_file, 'regresion')
+    except Exception as e:
+        st.error(f"Error cargando archivo: {e}")
+        return
+    num_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    if len(num_cols) < 2:
+        st.error("Se necesitan al menos dos columnas numéricas.")
+        return
+
+    clave = clave_archivo(uploaded_file)
+    if st.button("Calcular todos los pares"):
+        # Solo filas completas en todas las columnas numéricas: una única pasada. El frame
+        # filtrado queda en la caché para que la tabla de pasos muestre esas mismas filas
+        completas = cargar_derivado(uploaded_file, 'regresion', ('pares', tuple(num_cols)),
+                                    lambda vista: vista[num_cols].dropna())
+        n, medias, C = comomentos_por_bloques(completas.to_numpy(dtype=float))
+        st.session_state['pares_lineal'] = {'clave': clave, 'columnas': num_cols, 'n': n,
+                                            'medias': medias, 'C': C}
+    pares = st.session_state.get('pares_lineal')
+    if pares is None or pares['clave'] != clave:
+        return
+
+    columnas = pares['columnas']
+    beta_0, beta_1, r2 = matrices_pares(pares['medias'], pares['C'], columnas)
+    st.caption(f"{pares['n']} filas completas · fila = X, columna = Y")
+    metrica = st.radio("Mapa de calor", ("R²", "β₁", "β₀"), horizontal=True, key="metrica_pares")
+    matriz = {"R²": r2, "β₁": beta_1, "β₀": beta_0}[metrica]
+    st.dataframe(matriz.style.background_gradient(cmap='viridis', axis=None).format("{:.4f}"))
+
+    largo = pd.DataFrame({
+        "X": np.repeat(columnas, len(columnas)),
+        "Y": np.tile(columnas, len(columnas)),
+        "β₀": beta_0.to_numpy().ravel(),
+        "β₁": beta_1.to_numpy().ravel(),
+        "R²": r2.to_numpy().ravel(),
+    })
+    largo = largo[largo["X"] != largo["Y"]].sort_values("R²", ascending=False, na_position='last')
+    st.dataframe(largo.reset_index(drop=True))
+
+    x_col = st.selectbox("Variable independiente (X)", columnas, key="x_col_pares")
+    y_col = st.selectbox("Variable dependiente (Y)", [c for c in columnas if c != x_col], key="y_col_pares")
+    if st.button("Ver paso a paso de este par"):
+        try:
+            # Sin recalcular: los estadísticos del par salen de la matriz de co-momentos
+            guardar_resultado(estadisticos_de_par(pares, x_col, y_col), x_col, y_col, clave,
+                              derivado=('pares', tuple(columnas)))
+        except Exception as e:
+            st.error(f"Error en el cálculo: {str(e)}")
 
 def procesar_regresion_lineal():
     st.title("📈 Regresión Lineal Simple ")
 
-    uploaded_file = st.file_uploader("Sube tu archivo CSV o Excel", type=["csv", "xlsx"])
-    if uploaded_file is not None:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file)
-        st.session_state['df'] = df  # Guardamos df en session_state para persistencia
-
-        st.subheader("Vista previa del dataset")
-        st.dataframe(df)
-
-        columnas = df.columns.tolist()
-        x_col = st.selectbox("Selecciona la variable independiente (X)", columnas, key="x_col_select")
-        y_col = st.selectbox("Selecciona la variable dependiente (Y)", [col for col in columnas if col != x_col], key="y_col_select")
-
-        calcular = st.button("Calcular regresión paso a paso")
-
-        if calcular:
-            try:
-                X = df[x_col].values
-                Y = df[y_col].values
-                n = len(X)
-
-                x_mean = np.mean(X)
-                y_mean = np.mean(Y)
-
-                x_squared = X**2
-                xy = X * Y
-                tabla = pd.DataFrame({
-                    x_col: X,
-                    y_col: Y,
-                    f"{x_col}^2": x_squared,
-                    f"{x_col}*{y_col}": xy
-                })
-
-                sum_x = np.sum(X)
-                sum_y = np.sum(Y)
-                sum_x2 = np.sum(x_squared)
-                sum_xy = np.sum(xy)
-
-                numerador = n * sum_xy - sum_x * sum_y
-                denominador = n * sum_x2 - sum_x**2
-                beta_1 = numerador / denominador
-                beta_0 = y_mean - beta_1 * x_mean
-
-                # Guardamos resultados en session_state
-                st.session_state['beta_0'] = beta_0
-                st.session_state['beta_1'] = beta_1
-                st.session_state['x_col'] = x_col
-                st.session_state['y_col'] = y_col
-                st.session_state['tabla'] = tabla
-                st.session_state['calculo_realizado'] = True
-
-            except Exception as e:
-                st.error(f"Error en el cálculo: {str(e)}")
-
+    modo = st.radio("Modo de cálculo", ("En memoria", "Streaming por bloques (CSV grandes)", "Todos los pares"),
+                    horizontal=True, key="modo_regresion_lineal")
+    if modo == "En memoria":
+        cargar_en_memoria()
+    elif modo == "Todos los pares":
+        cargar_todos_los_pares()
     else:
-        st.info("Por favor, sube un archivo para continuar.")
+        cargar_por_bloques()
 
     # Mostrar resultados calculados si ya hay datos guardados
-    if st.session_state.get('calculo_realizado', False) and 'df' in st.session_state:
-        df = st.session_state['df']
+    if st.session_state.get('calculo_realizado', False) and 'estadisticos' in st.session_state:
+        est = st.session_state['estadisticos']
+        pasos = traza(est)
         st.markdown("### Paso 1: Cálculo de medias")
-        st.markdown(f"Media de {st.session_state['x_col']}: **{np.mean(df[st.session_state['x_col']]):.2f}**")
-        st.markdown(f"Media de {st.session_state['y_col']}: **{np.mean(df[st.session_state['y_col']]):.2f}**")
+        st.markdown(f"Media de {st.session_state['x_col']}: **{pasos['media_x']:.2f}**")
+        st.markdown(f"Media de {st.session_state['y_col']}: **{pasos['media_y']:.2f}**")
 
         st.markdown("### Paso 2: Tabla de valores para cálculo")
-        st.dataframe(st.session_state['tabla'])
+        mostrar_tabla_pasos(est)
 
         st.markdown("### Paso 3: Sumas necesarias")
-        st.markdown(f"∑X = **{np.sum(df[st.session_state['x_col']]):.2f}**")
-        st.markdown(f"∑Y = **{np.sum(df[st.session_state['y_col']]):.2f}**")
-        st.markdown(f"∑X² = **{np.sum(df[st.session_state['x_col']]**2):.2f}**")
-        st.markdown(f"∑XY = **{np.sum(df[st.session_state['x_col']] * df[st.session_state['y_col']]):.2f}**")
-        st.markdown(f"n = **{len(df)}**")
+        st.markdown(f"∑X = **{pasos['sum_x']:.2f}**")
+        st.markdown(f"∑Y = **{pasos['sum_y']:.2f}**")
+        st.markdown(f"∑X² = **{pasos['sum_x2']:.2f}**")
+        st.markdown(f"∑XY = **{pasos['sum_xy']:.2f}**")
+        st.markdown(f"n = **{pasos['n']}**")
 
         st.markdown("### Paso 4: Cálculo de la pendiente (β₁)")
         st.markdown(f"β₁ = **{st.session_state['beta_1']:.4f}**")
@@ -96,8 +109,102 @@ def procesar_regresion_lineal():
             submit_button = st.form_submit_button(label='Calcular predicción')
 
         if submit_button:
-            prediccion = st.session_state['beta_0'] + st.session_state['beta_1'] * nuevo_valor
+            prediccion = predecir((st.session_state['beta_0'], st.session_state['beta_1']), nuevo_valor)
             st.success(f"Predicción para {st.session_state['x_col']} = {nuevo_valor:.2f} ➤ {st.session_state['y_col']} = {prediccion:.2f}")
 
+        mostrar_prediccion_lotes([st.session_state['x_col']],
+                                 [st.session_state['beta_0'], st.session_state['beta_1']],
+                                 st.session_state['y_col'], "lotes_lineal")
+        mostrar_actualizacion_incremental()
+
+def mostrar_actualizacion_incremental():
+    est = st.session_state['estadisticos']
+    x_col = st.session_state['x_col']
+    y_col = st.session_state['y_col']
+
+    def importar(datos):
+        otro, x_otro, y_otro = importar_estadisticos(datos)
+        return otro, [x_otro], y_otro
+
+    def recalcular(est):
+        st.session_state['beta_0'], st.session_state['beta_1'] = est.coeficientes()
+
+    mostrar_actualizacion(est, [x_col], y_col, "lineal",
+                          lambda df: ajustar(df[x_col].values, df[y_col].values),
+                          exportar_estadisticos(est, x_col, y_col), importar, recalcular)
+
+def mostrar_tabla_pasos(est):
+    # La tabla no se guarda en la sesión: se calcula solo la ventana visible
+    x_col = st.session_state['x_col']
+    y_col = st.session_state['y_col']
+    muestra = st.session_state.get('muestra')
+    if muestra is not None:
+        st.caption(f"Muestra aleatoria de {len(muestra)} de {est.n} filas.")
+        st.dataframe(muestra)
+        return
+    derivado = st.session_state.get('derivado_datos')
+    if derivado is not None:
+        df = obtener_derivado(st.session_state['clave_datos'], 'regresion', derivado)
+    else:
+        df = obtener_datos(st.session_state['clave_datos'], 'regresion')
+    if df is None:
+        st.info("El archivo ya no está en memoria; vuelve a subirlo para ver la tabla.")
+        return
+    if len(df) < est.n:
+        st.caption(f"Tabla del archivo inicial ({len(df)} filas); el modelo incluye {est.n}.")
+    inicio, fin = seleccionar_ventana(len(df), "pasos_lineal")
+    tabla = tabla_pasos(df[x_col].values[inicio:fin], df[y_col].values[inicio:fin], x_col, y_col)
+    tabla.index = df.index[inicio:fin]
+    st.dataframe(tabla)
+
+def guardar_resultado(est, x_col, y_col, clave=None, muestra=None, derivado=None):
+    beta_0, beta_1 = est.coeficientes()
+    st.session_state['beta_0'] = beta_0
+    st.session_state['beta_1'] = beta_1
+    st.session_state['x_col'] = x_col
+    st.session_state['y_col'] = y_col
+    st.session_state['estadisticos'] = est
+    # Referencia al dataset compartido (modo en memoria) o muestra acotada (modo por bloques)
+    st.session_state['clave_datos'] = clave
+    st.session_state['muestra'] = muestra
+    # Filas con las que se calcularon los estadísticos cuando no es el archivo entero
+    st.session_state['derivado_datos'] = derivado
+    st.session_state['calculo_realizado'] = True
+    # Archivos ya incluidos en los estadísticos (evita sumar dos veces el mismo delta)
+    st.session_state['deltas_aplicados_lineal'] = {clave} if clave else set()
+
+def cargar_en_memoria():
+    uploaded_file = st.file_uploader("Sube tu archivo CSV o Excel", type=["csv", "xlsx"])
+    if uploaded_file is None:
+        st.info("Por favor, sube un archivo para continuar.")
+        return
+
+    df = cargar_datos(uploaded_file, 'regresion')
+
+    st.subheader("Vista previa del dataset")
+    st.dataframe(df)
+
+    columnas = df.columns.tolist()
+    x_col = st.selectbox("Selecciona la variable independiente (X)", columnas, key="x_col_select")
+    y_col = st.selectbox("Selecciona la variable dependiente (Y)", [col for col in columnas if col != x_col], key="y_col_select")
+
+    if st.button("Calcular regresión paso a paso"):
+        try:
+            X = df[x_col].values
+            Y = df[y_col].values
+            est = ajustar(X, Y)
+            guardar_resultado(est, x_col, y_col, clave_archivo(uploaded_file))
+        except Exception as e:
+            st.error(f"Error en el cálculo: {str(e)}")
+
+def seleccionar_variables_bloques(columnas):
+    x_col = st.selectbox("Selecciona la variable independiente (X)", columnas, key="x_col_bloques")
+    y_col = st.selectbox("Selecciona la variable dependiente (Y)", [col for col in columnas if col != x_col], key="y_col_bloques")
+    return x_col, y_col
+
+def cargar_por_bloques():
+    cargar_csv_por_bloques("csv_bloques", seleccionar_variables_bloques, estadisticos_por_bloques,
+                           guardar_resultado, "Calcular regresión por bloques")
+
 def run():
     procesar_regresion_lineal()
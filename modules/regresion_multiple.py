@@ -1,11 +1,107 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
+from modules.actualizacion_incremental import cargar_csv_por_bloques, mostrar_actualizacion
+from modules.carga_datos import cargar_datos, clave_archivo, obtener_datos
+from modules.paginacion import seleccionar_ventana
+from modules.prediccion_lotes import mostrar_prediccion_lotes
+from nucleo.regresion_multiple import (ajustar, estadisticos_por_bloques, exportar_estadisticos,
+                                       importar_estadisticos, matriz_diseno, predecir, traza)
+from nucleo.seleccion_variables import mejor_subconjunto, seleccion_hacia_adelante, seleccion_hacia_atras
 
 def procesar_regresion_multiple():
     st.title("📊 Regresión Lineal Múltiple")
 
+    modo = st.radio("Modo de cálculo", ("En memoria", "Streaming por bloques (CSV grandes)"),
+                    horizontal=True, key="modo_regresion_multiple")
+    if modo == "En memoria":
+        cargar_en_memoria()
+    else:
+        cargar_por_bloques()
+
+    # Mostrar resultados calculados
+    if st.session_state.get('calculo_realizado', False) and 'estadisticos_multiples' in st.session_state:
+        est = st.session_state['estadisticos_multiples']
+        mostrar_matriz_diseno(est)
+
+        st.markdown("### Coeficientes calculados (β)")
+        coef_df = pd.DataFrame({
+            "Variable": ["Intercepto"] + st.session_state['x_cols'],
+            "Coeficiente (β)": st.session_state['beta']
+        })
+        st.dataframe(coef_df)
+
+        solucion = st.session_state['solucion']
+        st.markdown(f"Método de resolución: **{solucion['metodo']}** · "
+                    f"número de condición (variables estandarizadas): **{solucion['condicion']:.3g}**")
+        if solucion['rango'] < len(st.session_state['x_cols']):
+            st.warning(f"Las variables independientes tienen rango {solucion['rango']} de "
+                       f"{len(st.session_state['x_cols'])} (multicolinealidad). "
+                       "Se muestra la solución de norma mínima.")
+        elif solucion['metodo'] == 'lstsq':
+            st.warning("Variables casi colineales: se resolvió por SVD en lugar de Cholesky.")
+
+        # Mostrar ecuación final
+        ecuacion = f"{st.session_state['y_col']} = {st.session_state['beta'][0]:.4f}"
+        for i, col in enumerate(st.session_state['x_cols'], start=1):
+            coef = st.session_state['beta'][i]
+            signo = "+" if coef >= 0 else "-"
+            ecuacion += f" {signo} {abs(coef):.4f} * {col}"
+        st.markdown(f"### Ecuación de regresión final:\n\n{ecuacion}")
+
+        # Formulario para predicción
+        with st.form(key='form_prediccion_multiple'):
+            st.markdown("### Realiza una predicción")
+            valores = {}
+            for col in st.session_state['x_cols']:
+                valores[col] = st.number_input(f"Ingrese valor para {col}", value=0.0)
+            submit_button = st.form_submit_button(label='Calcular predicción')
+
+        if submit_button:
+            prediccion = predecir(st.session_state['beta'], [valores[col] for col in st.session_state['x_cols']])
+            st.success(f"Predicción para {st.session_state['y_col']}: {prediccion:.4f}")
+
+        mostrar_prediccion_lotes(st.session_state['x_cols'], st.session_state['beta'],
+                                 st.session_state['y_col'], "lotes_multiple")
+        mostrar_actualizacion_incremental()
+
+def mostrar_matriz_diseno(est):
+    # X_b e Y no se guardan en la sesión: se construye solo la ventana visible
+    x_cols = st.session_state['x_cols']
+    y_col = st.session_state['y_col']
+    datos = st.session_state.get('vista_multiple')
+    if datos is None:
+        datos = obtener_datos(st.session_state['clave_datos_multiple'], 'regresion')
+        if datos is None:
+            st.info("El archivo ya no está en memoria; vuelve a subirlo para ver la matriz de diseño.")
+            return
+    if len(datos) < est.n:
+        st.caption(f"Se muestran {len(datos)} filas; el modelo incluye {est.n}.")
+    inicio, fin = seleccionar_ventana(len(datos), "diseno_multiple")
+    ventana = datos.iloc[inicio:fin]
+
+    st.markdown("### Matriz de diseño X (con columna de unos para intercepto)")
+    st.dataframe(matriz_diseno(ventana, x_cols, range(inicio, fin)))
+
+    st.markdown("### Vector de variable dependiente Y")
+    st.dataframe(pd.DataFrame({y_col: ventana[y_col].to_numpy()}, index=range(inicio, fin)))
+
+def guardar_resultado(est, x_cols, y_col, clave=None, vista=None):
+    solucion = traza(est)
+    st.session_state['beta'] = solucion['beta']
+    st.session_state['solucion'] = solucion
+    st.session_state['x_cols'] = x_cols
+    st.session_state['y_col'] = y_col
+    st.session_state['estadisticos_multiples'] = est
+    # Referencia al dataset compartido (modo en memoria) o primeras filas (modo por bloques)
+    st.session_state['clave_datos_multiple'] = clave
+    st.session_state['vista_multiple'] = vista
+    # Archivos ya incluidos en los estadísticos (evita sumar dos veces el mismo delta)
+    st.session_state['deltas_aplicados_multiple'] = {clave} if clave else set()
+    st.session_state['calculo_realizado'] = True
+
+def cargar_en_memoria():
     uploaded_file = st.file_uploader("Sube tu archivo CSV o Excel", type=["csv", "xlsx"])
     if uploaded_file is None:
         st.info("Por favor, sube un archivo para continuar.")
@@ -13,11 +109,7 @@ def procesar_regresion_multiple():
 
     # Cargar DataFrame
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file)
-        st.session_state['df'] = df
+        df = cargar_datos(uploaded_file, 'regresion')
     except Exception as e:
         st.error(f"Error cargando archivo: {e}")
         return
@@ -27,75 +119,91 @@ def procesar_regresion_multiple():
 
     columnas = df.columns.tolist()
     y_col = st.selectbox("Selecciona la variable dependiente (Y)", columnas, key="y_col_multiple")
+    with st.expander("🔎 Selección automática de variables"):
+        mostrar_seleccion_automatica(df, y_col)
     x_cols = st.multiselect("Selecciona las variables independientes (X)", [col for col in columnas if col != y_col], key="x_cols_multiple")
 
     if not x_cols:
         st.warning("Selecciona al menos una variable independiente.")
         return
 
-    calcular = st.button("Calcular regresión múltiple paso a paso")
-
-    if calcular:
+    if st.button("Calcular regresión múltiple paso a paso"):
         try:
             X = df[x_cols].values
-            Y = df[y_col].values.reshape(-1, 1)
-            n, k = X.shape
-
-            # Agregar columna de unos para intercepto
-            X_b = np.hstack([np.ones((n, 1)), X])
-
-            # Calcular coeficientes β usando ecuación normal
-            beta = np.linalg.inv(X_b.T @ X_b) @ X_b.T @ Y
-            beta = beta.flatten()
-
-            # Guardar en session_state para persistencia
-            st.session_state['beta'] = beta
-            st.session_state['x_cols'] = x_cols
-            st.session_state['y_col'] = y_col
-            st.session_state['X_b'] = X_b
-            st.session_state['Y'] = Y
-            st.session_state['calculo_realizado'] = True
-
+            Y = df[y_col].values
+            est = ajustar(X, Y)
+            guardar_resultado(est, x_cols, y_col, clave_archivo(uploaded_file))
         except np.linalg.LinAlgError:
             st.error("Error: La matriz X^T * X no es invertible. Puede haber multicolinealidad entre variables independientes.")
         except Exception as e:
             st.error(f"Error en el cálculo: {str(e)}")
 
-    # Mostrar resultados calculados
-    if st.session_state.get('calculo_realizado', False):
-        st.markdown("### Matriz de diseño X (con columna de unos para intercepto)")
-        st.dataframe(pd.DataFrame(st.session_state['X_b'], columns=["Intercepto"] + st.session_state['x_cols']))
+def _usar_variables(variables):
+    # Callback: se ejecuta antes del rerun, cuando aún se puede cambiar el multiselect
+    st.session_state['x_cols_multiple'] = list(variables)
 
-        st.markdown("### Vector de variable dependiente Y")
-        st.dataframe(pd.DataFrame(st.session_state['Y'], columns=[st.session_state['y_col']]))
+def mostrar_seleccion_automatica(df, y_col):
+    candidatas = [c for c in df.columns if c != y_col and pd.api.types.is_numeric_dtype(df[c])]
+    if not candidatas:
+        st.info("No hay columnas numéricas candidatas.")
+        return
+    metodo = st.selectbox("Método", ("Hacia adelante", "Hacia atrás", "Mejor subconjunto (exhaustiva)"),
+                          key="metodo_seleccion")
+    paralelo = False
+    if metodo == "Mejor subconjunto (exhaustiva)":
+        paralelo = st.checkbox("Búsqueda exhaustiva en paralelo (varios núcleos)", value=False,
+                               key="paralelo_seleccion")
+    if st.button("Buscar variables", key="buscar_seleccion"):
+        datos = df[candidatas + [y_col]].dropna()
+        # Una sola matriz de Gram para todas las candidatas
+        est = ajustar(datos[candidatas].values, datos[y_col].values)
+        try:
+            if metodo == "Hacia adelante":
+                tabla = seleccion_hacia_adelante(est, candidatas)
+            elif metodo == "Hacia atrás":
+                tabla = seleccion_hacia_atras(est, candidatas)
+            else:
+                tabla = mejor_subconjunto(est, candidatas,
+                                          n_trabajadores=os.cpu_count() if paralelo else None)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.session_state['seleccion_multiple'] = (y_col, tabla)
+
+    guardado = st.session_state.get('seleccion_multiple')
+    if guardado is None or guardado[0] != y_col or guardado[1].empty:
+        return
+    tabla = guardado[1]
+    st.dataframe(tabla.assign(Variables=tabla['Variables'].map(', '.join)))
+    mejor = tabla.loc[tabla['AIC'].idxmin(), 'Variables']
+    st.markdown(f"Menor AIC: **{', '.join(mejor) or '(ninguna)'}**")
+    if mejor:
+        st.button("Usar estas variables", key="usar_seleccion", on_click=_usar_variables, args=(mejor,))
+
+def seleccionar_variables_bloques(columnas):
+    y_col = st.selectbox("Selecciona la variable dependiente (Y)", columnas, key="y_col_bloques_multiple")
+    x_cols = st.multiselect("Selecciona las variables independientes (X)", [col for col in columnas if col != y_col], key="x_cols_bloques_multiple")
+    if not x_cols:
+        st.warning("Selecciona al menos una variable independiente.")
+        return None
+    return x_cols, y_col
 
-        st.markdown("### Coeficientes calculados (β)")
-        coef_df = pd.DataFrame({
-            "Variable": ["Intercepto"] + st.session_state['x_cols'],
-            "Coeficiente (β)": st.session_state['beta']
-        })
-        st.dataframe(coef_df)
+def cargar_por_bloques():
+    cargar_csv_por_bloques("csv_bloques_multiple", seleccionar_variables_bloques, estadisticos_por_bloques,
+                           guardar_resultado, "Calcular regresión múltiple por bloques")
 
-        # Mostrar ecuación final
-        ecuacion = f"{st.session_state['y_col']} = {st.session_state['beta'][0]:.4f}"
-        for i, col in enumerate(st.session_state['x_cols'], start=1):
-            coef = st.session_state['beta'][i]
-            signo = "+" if coef >= 0 else "-"
-            ecuacion += f" {signo} {abs(coef):.4f} * {col}"
-        st.markdown(f"### Ecuación de regresión final:\n\n{ecuacion}")
+def mostrar_actualizacion_incremental():
+    est = st.session_state['estadisticos_multiples']
+    x_cols = st.session_state['x_cols']
+    y_col = st.session_state['y_col']
 
-        # Formulario para predicción
-        with st.form(key='form_prediccion_multiple'):
-            st.markdown("### Realiza una predicción")
-            valores = {}
-            for col in st.session_state['x_cols']:
-                valores[col] = st.number_input(f"Ingrese valor para {col}", value=0.0)
-            submit_button = st.form_submit_button(label='Calcular predicción')
+    def recalcular(est):
+        st.session_state['solucion'] = traza(est)
+        st.session_state['beta'] = st.session_state['solucion']['beta']
 
-        if submit_button:
-            x_input = np.array([1] + [valores[col] for col in st.session_state['x_cols']])
-            prediccion = x_input @ st.session_state['beta']
-            st.success(f"Predicción para {st.session_state['y_col']}: {prediccion:.4f}")
+    mostrar_actualizacion(est, x_cols, y_col, "multiple",
+                          lambda df: ajustar(df[x_cols].values, df[y_col].values),
+                          exportar_estadisticos(est, x_cols, y_col), importar_estadisticos, recalcular)
 
 def run():
     procesar_regresion_multiple()
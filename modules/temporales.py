@@ -0,0 +1,32 @@
+import os
+import tempfile
+import time
+
+# Resultados descargables de las páginas: se escriben solo en un directorio propio del
+# servidor y caducan, así no se acumulan los de sesiones que ya se cerraron
+DIRECTORIO = os.path.join(tempfile.gettempdir(), "app_prediccion")
+CADUCIDAD_S = int(os.environ.get("CADUCIDAD_RESULTADOS_S", "3600"))
+
+def _purgar():
+    limite = time.time() - CADUCIDAD_S
+    try:
+        entradas = list(os.scandir(DIRECTORIO))
+    except OSError:
+        return
+    for entrada in entradas:
+        try:
+            if entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+        except OSError:
+            pass
+
+def nuevo_resultado(prefijo):
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    _purgar()
+    fd, ruta = tempfile.mkstemp(prefix=prefijo, suffix=".csv", dir=DIRECTORIO)
+    os.close(fd)
+    return ruta
+
+def descartar(ruta):
+    if ruta and os.path.exists(ruta):
+        os.remove(ruta)
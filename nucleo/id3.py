@@ -0,0 +1,535 @@
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Árbol ID3 sin interfaz: normalización, construcción con traza, predicción y caché.
+# Solo depende de numpy y pandas; la página de Streamlit y los benchmarks lo usan igual.
+
+# --- Normalización y limpieza ---
+def normalizar_texto(texto):
+    texto = str(texto).strip().lower()
+    texto = ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+    return texto
+
+# Tabla por defecto; se puede reemplazar pasando `correcciones`
+CORRECCIONES_ORTOGRAFICAS = {'ingnieria': 'ingenieria'}
+
+def corregir_errores_ortograficos(valor, correcciones=None):
+    if correcciones is None:
+        correcciones = CORRECCIONES_ORTOGRAFICAS
+    return correcciones.get(valor, valor)
+
+def normalizar_columna(serie, correcciones=None):
+    # Se normaliza cada valor distinto una sola vez y se reasigna por códigos
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    normalizados = np.array([corregir_errores_ortograficos(normalizar_texto(v), correcciones)
+                             for v in unicos], dtype=object)
+    categorias, inverso = np.unique(normalizados, return_inverse=True)
+    return pd.Series(pd.Categorical.from_codes(inverso[codigos], categories=categorias),
+                     index=serie.index, name=serie.name)
+
+def limpiar_y_normalizar_df(df, columnas, correcciones=None):
+    for col in columnas:
+        df[col] = normalizar_columna(df[col], correcciones)
+    return df
+
+def leer_correcciones(texto):
+    correcciones = {}
+    for linea in texto.splitlines():
+        if '=' in linea:
+            mal, bien = linea.split('=', 1)
+            correcciones[normalizar_texto(mal)] = normalizar_texto(bien)
+    return correcciones
+
+# --- Codificación entera (una sola vez por construcción) ---
+class DatosCodificados:
+    def __init__(self, data, columnas):
+        self.n = len(data)
+        self.codigos = {}
+        self.categorias = {}
+        self.cod_interrogacion = {}
+        for col in columnas:
+            codigos, categorias = pd.factorize(data[col], sort=True)
+            self.codigos[col] = codigos
+            self.categorias[col] = np.asarray(categorias, dtype=object)
+            pos = np.flatnonzero(self.categorias[col] == '?')
+            self.cod_interrogacion[col] = int(pos[0]) if len(pos) else -1
+
+    def validos(self, col, codigos):
+        # Excluye '?' y valores no codificables (NaN -> -1)
+        return (codigos >= 0) & (codigos != self.cod_interrogacion[col])
+
+def tabla_contingencia(cod_valores, cod_clases, n_valores, n_clases):
+    plano = cod_valores.astype(np.int64) * n_clases + cod_clases
+    return np.bincount(plano, minlength=n_valores * n_clases).reshape(n_valores, n_clases)
+
+def entropia_por_fila(conteos, k):
+    conteos = np.asarray(conteos, dtype=float)
+    totales = conteos.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.where(totales > 0, conteos / totales, 0.0)
+        terminos = np.where(p > 0, p * np.log(p), 0.0)
+        return (0.0 - terminos.sum(axis=1)) / np.log(k)
+
+# --- Cálculo de entropía ---
+def calcular_entropia(etiquetas, base=None):
+    valores, conteos = np.unique(etiquetas, return_counts=True)
+    k = base or len(valores)
+    return float(entropia_por_fila(conteos[np.newaxis, :], k)[0])
+
+# --- Entropía condicional estilo profesor ---
+def conteos_condicionales(cod, idx, atributo, target):
+    cod_a = cod.codigos[atributo][idx]
+    cod_t = cod.codigos[target][idx]
+    mascara = cod.validos(atributo, cod_a) & (cod_t >= 0)
+    tabla = tabla_contingencia(cod_a[mascara], cod_t[mascara],
+                               len(cod.categorias[atributo]), len(cod.categorias[target]))
+    presentes = np.flatnonzero(tabla.sum(axis=1))
+    return cod.categorias[atributo][presentes], tabla[presentes]
+
+def _entropia_condicional_codificada(cod, idx, atributo, target, clases_global):
+    valores, tabla = conteos_condicionales(cod, idx, atributo, target)
+    k = len(clases_global)
+    pos_clase = {c: i for i, c in enumerate(cod.categorias[target])}
+    columnas = [pos_clase.get(cls) for cls in clases_global]
+
+    conteos = tabla.sum(axis=1)
+    n_total = conteos.sum()
+    contribs = conteos / n_total * entropia_por_fila(tabla, k) if n_total else np.zeros(0)
+    E_cond = float(contribs.sum())
+
+    # Conteos alineados con clases_global para la traza
+    alineada = np.zeros((len(valores), k), dtype=np.int64)
+    for j, col in enumerate(columnas):
+        if col is not None:
+            alineada[:, j] = tabla[:, col]
+    detalle = {
+        'atributo': atributo,
+        'valores': list(valores),
+        'conteos': alineada,
+        'contribuciones': contribs,
+        'E': E_cond,
+    }
+    return E_cond, detalle
+
+def entropia_condicional(data, atributo, target, clases_global):
+    cod = DatosCodificados(data, [atributo, target])
+    E_cond, _ = _entropia_condicional_codificada(cod, np.arange(cod.n), atributo, target, clases_global)
+    return E_cond
+
+# --- Nodo de decisión ---
+class NodoDecision:
+    def __init__(self, atributo=None, hijos=None, es_hoja=False, clase=None):
+        self.atributo = atributo
+        self.hijos = hijos or {}
+        self.es_hoja = es_hoja
+        self.clase = clase
+
+# --- Construcción recursiva (sin llamadas a la interfaz) ---
+def particionar(cod, idx, atributo):
+    # Como en la entropía, las filas con '?' o NaN en el atributo no se reparten
+    idx = idx[cod.validos(atributo, cod.codigos[atributo][idx])]
+    if idx.size == 0:
+        return
+    cod_a = cod.codigos[atributo][idx]
+    orden = np.argsort(cod_a, kind='stable')
+    cortes = np.flatnonzero(np.diff(cod_a[orden])) + 1
+    for grupo in np.split(idx[orden], cortes):
+        yield cod.categorias[atributo][cod.codigos[atributo][grupo[0]]], grupo
+
+def _evaluar_atributos(cod, idx, atributos, target, clases_global):
+    return [_entropia_condicional_codificada(cod, idx, a, target, clases_global) for a in atributos]
+
+def _construir_nodo(cod, idx, atributos, target, clases_global, camino, traza, paralelo=None):
+    idx = idx[cod.validos(target, cod.codigos[target][idx])]
+    registro = {'camino': camino, 'n': int(idx.size), 'entropias': [], 'mejor': None,
+                'particiones': [], 'hoja': None}
+    traza.append(registro)
+    if idx.size == 0:
+        registro['hoja'] = 'Desconocido'
+        return NodoDecision(es_hoja=True, clase='Desconocido')
+    if not atributos:
+        # Sin atributos restantes y clases mezcladas: hoja con la clase mayoritaria
+        clase_leaf = cod.categorias[target][np.bincount(cod.codigos[target][idx]).argmax()]
+        registro['hoja'] = clase_leaf
+        return NodoDecision(es_hoja=True, clase=clase_leaf)
+
+    if paralelo is not None:
+        resultados = paralelo.evaluar(idx, atributos, target, clases_global)
+    else:
+        resultados = _evaluar_atributos(cod, idx, atributos, target, clases_global)
+    # Los resultados llegan en el orden de `atributos`: min() desempata igual que en serie
+    entropias = {}
+    for attr, (E_cond, detalle) in zip(atributos, resultados):
+        registro['entropias'].append(detalle)
+        # Un atributo sin ningún valor válido en el nodo no puede particionarlo
+        if detalle['conteos'].sum():
+            entropias[attr] = E_cond
+    if not entropias:
+        clase_leaf = cod.categorias[target][np.bincount(cod.codigos[target][idx]).argmax()]
+        registro['hoja'] = clase_leaf
+        return NodoDecision(es_hoja=True, clase=clase_leaf)
+    mejor = min(entropias, key=entropias.get)
+    registro['mejor'] = mejor
+    nodo = NodoDecision(atributo=mejor)
+
+    pendientes = []
+    for val, grupo in particionar(cod, idx, mejor):
+        cod_t = cod.codigos[target][grupo]
+        if (cod_t == cod_t[0]).all():
+            clase_leaf = cod.categorias[target][cod_t[0]]
+            registro['particiones'].append((val, clase_leaf))
+            nodo.hijos[val] = NodoDecision(es_hoja=True, clase=clase_leaf)
+            continue
+        registro['particiones'].append((val, None))
+        resto = [a for a in atributos if a != mejor]
+        sub_camino = camino + ((mejor, val),)
+        if paralelo is not None and not camino:
+            # Subárboles hermanos de la raíz: se construyen en paralelo
+            nodo.hijos[val] = None
+            pendientes.append((val, paralelo.subarbol(grupo, resto, target, clases_global, sub_camino)))
+        else:
+            nodo.hijos[val] = _construir_nodo(cod, grupo, resto, target, clases_global, sub_camino, traza)
+    # Se recogen en orden para que la traza quede igual que en la construcción en serie
+    for val, futuro in pendientes:
+        nodo.hijos[val], sub_traza = futuro.result()
+        traza.extend(sub_traza)
+    return nodo
+
+# --- Evaluación paralela (opcional) ---
+_COD_TRABAJADOR = None
+
+def _iniciar_trabajador(cod):
+    global _COD_TRABAJADOR
+    _COD_TRABAJADOR = cod
+
+def _evaluar_en_trabajador(idx, atributos, target, clases_global):
+    return _evaluar_atributos(_COD_TRABAJADOR, idx, atributos, target, clases_global)
+
+def _subarbol(cod, idx, atributos, target, clases_global, camino):
+    traza = []
+    nodo = _construir_nodo(cod, idx, atributos, target, clases_global, camino, traza)
+    return nodo, traza
+
+def _subarbol_en_trabajador(idx, atributos, target, clases_global, camino):
+    return _subarbol(_COD_TRABAJADOR, idx, atributos, target, clases_global, camino)
+
+class EvaluadorParalelo:
+    def __init__(self, cod, n_trabajadores=None, usar_procesos=True, min_filas=2000):
+        self.cod = cod
+        self.n_trabajadores = n_trabajadores or os.cpu_count() or 1
+        self.usar_procesos = usar_procesos
+        self.min_filas = min_filas
+        if usar_procesos:
+            self.pool = ProcessPoolExecutor(self.n_trabajadores, initializer=_iniciar_trabajador,
+                                            initargs=(cod,))
+        else:
+            self.pool = ThreadPoolExecutor(self.n_trabajadores)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.shutdown()
+
+    def evaluar(self, idx, atributos, target, clases_global):
+        # Con pocos datos el reparto cuesta más que el cálculo
+        if len(atributos) < 2 or idx.size < self.min_filas:
+            return _evaluar_atributos(self.cod, idx, atributos, target, clases_global)
+        n_bloques = min(self.n_trabajadores, len(atributos))
+        bloques = [list(b) for b in np.array_split(np.array(atributos, dtype=object), n_bloques)]
+        if self.usar_procesos:
+            futuros = [self.pool.submit(_evaluar_en_trabajador, idx, b, target, clases_global) for b in bloques]
+        else:
+            futuros = [self.pool.submit(_evaluar_atributos, self.cod, idx, b, target, clases_global)
+                       for b in bloques]
+        return [r for f in futuros for r in f.result()]
+
+    def subarbol(self, idx, atributos, target, clases_global, camino):
+        if self.usar_procesos:
+            return self.pool.submit(_subarbol_en_trabajador, idx, atributos, target, clases_global, camino)
+        return self.pool.submit(_subarbol, self.cod, idx, atributos, target, clases_global, camino)
+
+def construir_arbol(data, atributos, target, clases_global=None, n_trabajadores=None, usar_procesos=True):
+    cod = DatosCodificados(data, list(atributos) + [target])
+    if clases_global is None:
+        clases_global = list(cod.categorias[target])
+    traza = []
+    raiz = np.arange(cod.n)
+    if n_trabajadores is not None and n_trabajadores > 1:
+        with EvaluadorParalelo(cod, n_trabajadores, usar_procesos) as paralelo:
+            arbol = _construir_nodo(cod, raiz, list(atributos), target, clases_global, (), traza, paralelo)
+    else:
+        arbol = _construir_nodo(cod, raiz, list(atributos), target, clases_global, (), traza)
+    return arbol, traza
+
+# --- Traza del cálculo ---
+def texto_camino(camino):
+    return ' y '.join(f"{a} = {v}" for a, v in camino) if camino else '(raíz)'
+
+# --- Extracción de reglas ---
+def extraer_reglas(nodo, camino=None):
+    camino = camino or []
+    if nodo.es_hoja:
+        cond = ' y '.join(camino) if camino else '(sin condición)'
+        return [f"Si {cond}, entonces Categoría = {nodo.clase}"]
+    reglas = []
+    for v, h in nodo.hijos.items():
+        reglas.extend(extraer_reglas(h, camino + [f"{nodo.atributo} = {v}"]))
+    return reglas
+
+# --- Predicción ---
+def predecir(nodo, ejemplo):
+    if nodo.es_hoja:
+        return nodo.clase
+    val = ejemplo.get(nodo.atributo)
+    if val not in nodo.hijos:
+        val = next(iter(nodo.hijos))
+    return predecir(nodo.hijos[val], ejemplo)
+
+# --- Árbol compilado (predicción por lotes) ---
+class ArbolCompilado:
+    def __init__(self, features, atributo_nodo, clase_nodo, hijos, vocabularios, clases):
+        self.features = features
+        self.atributo_nodo = atributo_nodo  # índice en features; -1 en hojas
+        self.clase_nodo = clase_nodo        # índice en clases; -1 en nodos internos
+        self.hijos = hijos                  # nodo × código de valor -> nodo hijo
+        self.vocabularios = vocabularios    # por atributo: valores vistos en el árbol
+        self.clases = clases
+
+def compilar_arbol(arbol, features):
+    pos_feature = {f: i for i, f in enumerate(features)}
+    nodos = [arbol]
+    i = 0
+    while i < len(nodos):
+        nodos.extend(nodos[i].hijos.values())
+        i += 1
+    ids = {id(n): j for j, n in enumerate(nodos)}
+
+    vocab = [dict() for _ in features]
+    for n in nodos:
+        if not n.es_hoja:
+            d = vocab[pos_feature[n.atributo]]
+            for v in n.hijos:
+                d.setdefault(v, len(d))
+    # La última columna recoge valores nunca vistos por el atributo
+    ancho = max((len(d) for d in vocab), default=0) + 1
+
+    clases = list(dict.fromkeys(n.clase for n in nodos if n.es_hoja))
+    pos_clase = {c: j for j, c in enumerate(clases)}
+    atributo_nodo = np.full(len(nodos), -1, dtype=np.int32)
+    clase_nodo = np.full(len(nodos), -1, dtype=np.int32)
+    hijos = np.zeros((len(nodos), ancho), dtype=np.int32)
+    for j, n in enumerate(nodos):
+        if n.es_hoja:
+            clase_nodo[j] = pos_clase[n.clase]
+            continue
+        a = pos_feature[n.atributo]
+        atributo_nodo[j] = a
+        # Misma regla que predecir: valor desconocido -> primer hijo
+        hijos[j, :] = ids[id(next(iter(n.hijos.values())))]
+        for v, h in n.hijos.items():
+            hijos[j, vocab[a][v]] = ids[id(h)]
+    vocabularios = [np.array(list(d), dtype=object) for d in vocab]
+    return ArbolCompilado(list(features), atributo_nodo, clase_nodo, hijos, vocabularios,
+                          np.array(clases, dtype=object))
+
+def predecir_lote(compilado, df):
+    n = len(df)
+    ancho = compilado.hijos.shape[1]
+    codigos = np.empty((n, len(compilado.features)), dtype=np.int32)
+    for a, f in enumerate(compilado.features):
+        col = df[f]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            # Solo se buscan las categorías; las filas se resuelven por código
+            cod_cat = pd.Index(compilado.vocabularios[a]).get_indexer(col.cat.categories.astype(str))
+            cod = np.where(col.cat.codes.to_numpy() < 0, -1, cod_cat[col.cat.codes.to_numpy()])
+        else:
+            cod = pd.Index(compilado.vocabularios[a]).get_indexer(col.astype(str))
+        codigos[:, a] = np.where(cod < 0, ancho - 1, cod)
+
+    pos = np.zeros(n, dtype=np.int32)
+    filas = np.arange(n)
+    # Avanza todas las filas activas un nivel por iteración
+    while filas.size:
+        attr = compilado.atributo_nodo[pos[filas]]
+        internas = attr >= 0
+        filas, attr = filas[internas], attr[internas]
+        pos[filas] = compilado.hijos[pos[filas], codigos[filas, attr]]
+    return compilado.clases[compilado.clase_nodo[pos]]
+
+def clasificar_por_bloques(fuente, nombre, compilado, correcciones, destino, col_prediccion,
+                           tam_bloque=200_000, na_values=None):
+    # Lee, normaliza, clasifica y escribe bloque a bloque: la memoria no crece con el archivo
+    inicio = time.perf_counter()
+    # Con na_values solo esos valores son NA (la página pasa su política de NA)
+    opciones = {} if na_values is None else dict(keep_default_na=False, na_values=sorted(na_values))
+    if nombre.endswith(".xlsx"):
+        # Excel no se puede leer por partes: se procesa como un único bloque
+        bloques = [pd.read_excel(fuente, **opciones)]
+    else:
+        bloques = pd.read_csv(fuente, chunksize=tam_bloque, **opciones)
+    features = compilado.features
+    filas = 0
+    with open(destino, 'w', newline='', encoding='utf-8') as salida:
+        for i, bloque in enumerate(bloques):
+            if i == 0:
+                faltantes = [c for c in features if c not in bloque.columns]
+                if faltantes:
+                    raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+            entradas = limpiar_y_normalizar_df(bloque[features].copy(), features, correcciones)
+            bloque[col_prediccion] = predecir_lote(compilado, entradas)
+            bloque.to_csv(salida, header=(i == 0), index=False)
+            filas += len(bloque)
+    return filas, time.perf_counter() - inicio
+
+# --- Persistencia del modelo ---
+VERSION_MODELO = 1
+DIRECTORIO_CACHE = os.environ.get(
+    "ID3_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "app_prediccion", "id3"))
+LIMITE_CACHE_BYTES = int(os.environ.get("ID3_CACHE_MB", "256")) * 2**20
+
+def _nodo_a_dict(nodo):
+    if nodo.es_hoja:
+        return {'c': nodo.clase}
+    return {'a': nodo.atributo, 'h': [[v, _nodo_a_dict(h)] for v, h in nodo.hijos.items()]}
+
+def _nodo_desde_dict(d):
+    if 'c' in d:
+        return NodoDecision(es_hoja=True, clase=d['c'])
+    return NodoDecision(atributo=d['a'], hijos={v: _nodo_desde_dict(h) for v, h in d['h']})
+
+def serializar_modelo(arbol, features, target, clases):
+    modelo = {'version': VERSION_MODELO, 'features': list(features), 'target': target,
+              'clases': list(clases), 'arbol': _nodo_a_dict(arbol)}
+    return json.dumps(modelo, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+def deserializar_modelo(datos):
+    modelo = json.loads(datos)
+    if modelo.get('version') != VERSION_MODELO:
+        raise ValueError(f"Versión de modelo no soportada: {modelo.get('version')}")
+    modelo['arbol'] = _nodo_desde_dict(modelo['arbol'])
+    return modelo
+
+# La traza se guarda como JSON, igual que el modelo: la caché puede estar en un
+# directorio compartido y leerla nunca debe ejecutar código
+def _traza_a_json(traza):
+    registros = [{'camino': [list(p) for p in r['camino']], 'n': r['n'], 'mejor': r['mejor'],
+                  'hoja': r['hoja'], 'particiones': [list(p) for p in r['particiones']],
+                  'entropias': [{'atributo': d['atributo'], 'valores': list(d['valores']),
+                                 'conteos': d['conteos'].tolist(),
+                                 'contribuciones': np.asarray(d['contribuciones']).tolist(), 'E': d['E']}
+                                for d in r['entropias']]}
+                 for r in traza]
+    return json.dumps(registros, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+def _traza_desde_json(datos):
+    traza = json.loads(datos)
+    for r in traza:
+        r['camino'] = tuple(tuple(p) for p in r['camino'])
+        r['particiones'] = [tuple(p) for p in r['particiones']]
+        for d in r['entropias']:
+            d['conteos'] = np.array(d['conteos'], dtype=np.int64).reshape(len(d['valores']), -1)
+            d['contribuciones'] = np.array(d['contribuciones'], dtype=float)
+    return traza
+
+def clave_cache(df_model, features, target):
+    h = hashlib.sha256()
+    h.update(json.dumps([VERSION_MODELO, list(features), target], ensure_ascii=False).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df_model[list(features) + [target]], index=False).values.tobytes())
+    return h.hexdigest()
+
+def cargar_de_cache(clave, directorio=None):
+    base = os.path.join(directorio or DIRECTORIO_CACHE, clave)
+    try:
+        with open(base + '.json', 'rb') as f:
+            modelo = deserializar_modelo(f.read())
+    except (OSError, ValueError):
+        return None
+    try:
+        with open(base + '.traza.json', 'rb') as f:
+            modelo['traza'] = _traza_desde_json(f.read())
+    except (OSError, ValueError, KeyError, TypeError):
+        modelo['traza'] = None
+    try:
+        # La fecha de modificación hace de último uso para la poda
+        os.utime(base + '.json')
+    except OSError:
+        pass
+    return modelo
+
+def _escribir_atomico(ruta, datos):
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(datos)
+    os.replace(tmp, ruta)
+
+def guardar_en_cache(clave, datos_modelo, traza=None, directorio=None):
+    directorio = directorio or DIRECTORIO_CACHE
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        base = os.path.join(directorio, clave)
+        if traza is not None:
+            _escribir_atomico(base + '.traza.json', _traza_a_json(traza))
+        _escribir_atomico(base + '.json', datos_modelo)
+        podar_cache(directorio)
+    except OSError:
+        # La caché es opcional: si el disco no es escribible se sigue sin ella
+        pass
+
+def podar_cache(directorio=None, limite=None):
+    # Borra los modelos usados hace más tiempo hasta que el directorio quede bajo el límite
+    directorio = directorio or DIRECTORIO_CACHE
+    limite = LIMITE_CACHE_BYTES if limite is None else limite
+    grupos = {}   # clave -> [bytes, último uso, rutas]
+    for entrada in os.scandir(directorio):
+        info = entrada.stat()
+        grupo = grupos.setdefault(entrada.name.split('.', 1)[0], [0, 0.0, []])
+        grupo[0] += info.st_size
+        grupo[1] = max(grupo[1], info.st_mtime)
+        grupo[2].append(entrada.path)
+    total = sum(g[0] for g in grupos.values())
+    for tamano, _, rutas in sorted(grupos.values(), key=lambda g: g[1]):
+        if total <= limite:
+            break
+        for ruta in rutas:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+        total -= tamano
+
+def construir_arbol_cacheado(df_model, features, target, n_trabajadores=None):
+    clave = clave_cache(df_model, features, target)
+    modelo = cargar_de_cache(clave)
+    if modelo is not None:
+        return modelo['arbol'], modelo['traza'], True
+    arbol, traza = construir_arbol(df_model, features, target, n_trabajadores=n_trabajadores)
+    clases = list(np.unique(df_model[target]))
+    guardar_en_cache(clave, serializar_modelo(arbol, features, target, clases), traza)
+    return arbol, traza, False
+
+# --- Ajuste sin interfaz ---
+def preparar_datos(df, correcciones=None):
+    # Igual que la página: sin filas incompletas y con los textos normalizados
+    df = df.dropna(how='any').copy()
+    return limpiar_y_normalizar_df(df, df.columns.tolist(), correcciones)
+
+def ajustar(df, features, target, n_trabajadores=None, usar_cache=False):
+    # Devuelve el modelo con las mismas claves que deserializar_modelo, más la traza
+    features = list(features)
+    df_model = df[features + [target]]
+    if usar_cache:
+        arbol, traza, desde_cache = construir_arbol_cacheado(df_model, features, target, n_trabajadores)
+    else:
+        arbol, traza = construir_arbol(df_model, features, target, n_trabajadores=n_trabajadores)
+        desde_cache = False
+    return {'version': VERSION_MODELO, 'features': features, 'target': target,
+            'clases': list(np.unique(df_model[target])), 'arbol': arbol, 'traza': traza,
+            'desde_cache': desde_cache}
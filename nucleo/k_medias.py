@@ -0,0 +1,433 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# K-medias sin interfaz. El ajuste en memoria solo necesita numpy: pandas (lectura por
+# bloques y tablas de resumen) y sklearn (silueta y PCA) se importan donde se usan.
+
+def euclidean_distance(a, b):
+    return np.linalg.norm(a - b, axis=1)
+
+# --- Partes comunes de los motores: datos, contador de distancias y actualización ---
+class _KernelBase:
+    def __init__(self, X):
+        self.X = np.asarray(X, dtype=np.float64)
+        self.calculadas = 0   # distancias punto-centroide de la última asignación
+
+    def recalcular_centroides(self, asign_idx, centroides):
+        # Ordenación por conteo (bincount + argsort estable en radix sobre int16): cada
+        # cluster queda en un tramo contiguo y su media se calcula igual que con la máscara,
+        # sin recorrer los n puntos una vez por cluster. Clusters vacíos conservan su centroide.
+        k = len(centroides)
+        conteos = np.bincount(asign_idx, minlength=k)
+        tipo = np.int16 if k <= np.iinfo(np.int16).max else np.intp
+        orden = np.argsort(asign_idx.astype(tipo), kind='stable')
+        agrupados = self.X[orden]
+        limites = np.concatenate(([0], np.cumsum(conteos)))
+        nuevos = np.array(centroides, dtype=np.float64, copy=True)
+        for j in np.flatnonzero(conteos):
+            nuevos[j] = agrupados[limites[j]:limites[j + 1]].mean(axis=0)
+        return nuevos
+
+# --- Núcleo vectorizado: distancias por expansión y actualización por bincount ---
+class KernelKMedias(_KernelBase):
+    def __init__(self, X, k, dtype=np.float64):
+        super().__init__(X)
+        self.Xc = self.X if dtype == np.float64 else self.X.astype(dtype)
+        self.norm_x = np.einsum('ij,ij->i', self.Xc, self.Xc)
+        self.d2 = np.empty((len(self.X), k), dtype=dtype)   # buffer reutilizado
+        self.eps = np.finfo(dtype).eps
+
+    def asignar(self, centroides):
+        # ‖x‖² − 2x·c + ‖c‖² con un único producto matricial sobre el buffer
+        C = np.asarray(centroides, dtype=self.Xc.dtype)
+        norm_c = np.einsum('ij,ij->i', C, C)
+        d2 = np.matmul(self.Xc, C.T, out=self.d2)
+        d2 *= -2
+        d2 += self.norm_x[:, None]
+        d2 += norm_c[None, :]
+        np.maximum(d2, 0, out=d2)
+        asign_idx = np.argmin(d2, axis=1)
+        self.calculadas = d2.size
+
+        if d2.shape[1] > 1:
+            # Cerca de un empate el redondeo de la expansión podría cambiar el argmin:
+            # esas filas se recalculan como en el bucle original (norma de la diferencia)
+            dos_menores = np.partition(d2, 1, axis=1)[:, :2]
+            cota = 16 * (self.X.shape[1] + 2) * self.eps * (self.norm_x + norm_c.max())
+            dudosas = np.flatnonzero(dos_menores[:, 1] - dos_menores[:, 0] <= 2 * cota)
+            if dudosas.size:
+                exactas = np.vstack([euclidean_distance(self.X[dudosas], c) for c in centroides]).T
+                asign_idx[dudosas] = np.argmin(exactas, axis=1)
+                d2[dudosas] = exactas ** 2
+        return asign_idx
+
+    def inercia(self, asign_idx):
+        return float(self.d2[np.arange(len(self.X)), asign_idx].sum())
+
+# --- Motor acelerado (Hamerly): cotas por desigualdad triangular ---
+# Por punto se guarda la distancia exacta a su centroide (u) y una cota inferior de la
+# distancia al segundo más cercano (l). Si u < max(l, s[a]), con s[a] la mitad de la
+# distancia de su centroide al más próximo, ningún otro centroide puede estar más cerca
+# y no hace falta calcular las k distancias. Se usa Hamerly y no Elkan porque las cotas
+# de Elkan ocupan n×k, igual que la matriz de distancias que se quiere evitar.
+HOLGURA_COTAS = 1e-9   # margen relativo: los casi-empates se recalculan como en el motor directo
+
+class KernelHamerly(_KernelBase):
+    def __init__(self, X, k):
+        super().__init__(X)
+        self.u = None
+        self.l = None
+        self.asign_idx = None
+        self.centroides = None
+
+    def _todas(self, filas, centroides):
+        # Mismo cálculo que el bucle original, solo para las filas indicadas
+        D = np.vstack([euclidean_distance(self.X[filas], c) for c in centroides]).T
+        asign_idx = np.argmin(D, axis=1)
+        u = D[np.arange(len(D)), asign_idx]
+        if D.shape[1] > 1:
+            l = np.partition(D, 1, axis=1)[:, 1]
+        else:
+            l = np.full(len(D), np.inf)
+        return asign_idx, u, l
+
+    def asignar(self, centroides):
+        centroides = np.asarray(centroides, dtype=np.float64)
+        n, k = len(self.X), len(centroides)
+        if self.asign_idx is None:
+            self.asign_idx, self.u, self.l = self._todas(slice(None), centroides)
+            self.centroides = centroides.copy()
+            self.calculadas = n * k
+            return self.asign_idx.copy()
+
+        # Desplazamiento de cada centroide: l baja en el mayor desplazamiento de los demás
+        deriva = np.linalg.norm(centroides - self.centroides, axis=1)
+        orden = np.argsort(deriva)
+        mayor = np.where(self.asign_idx == orden[-1], deriva[orden[-2]] if k > 1 else 0.0, deriva[orden[-1]])
+        self.l -= mayor
+        self.centroides = centroides.copy()
+
+        # u exacta para todos (n distancias): también da la inercia sin otra pasada
+        self.u = euclidean_distance(self.X, centroides[self.asign_idx])
+        if k > 1:
+            entre = np.sqrt(((centroides[:, None, :] - centroides[None, :, :]) ** 2).sum(axis=2))
+            np.fill_diagonal(entre, np.inf)
+            s = 0.5 * entre.min(axis=1)
+            cota = np.maximum(self.l, s[self.asign_idx])
+            revisar = np.flatnonzero(self.u >= cota - HOLGURA_COTAS * (np.abs(cota) + self.u))
+        else:
+            revisar = np.empty(0, dtype=np.intp)
+        if revisar.size:
+            a, u, l = self._todas(revisar, centroides)
+            self.asign_idx[revisar] = a
+            self.u[revisar] = u
+            self.l[revisar] = l
+        self.calculadas = n + revisar.size * k
+        return self.asign_idx.copy()
+
+    def inercia(self, asign_idx):
+        return float((self.u ** 2).sum())
+
+def inicializar_centroides_por_clase(df_known, x_cols, cat_col):
+    clases = df_known[cat_col].unique()
+    centroides = []
+    for c in clases:
+        media = df_known.loc[df_known[cat_col] == c, x_cols].mean().values
+        centroides.append(media)
+    return np.vstack(centroides), np.array(clases)
+
+def inicializar_kmeans_pp(X, k, rng):
+    # k-means++: cada nuevo centroide se elige con probabilidad proporcional a D(x)²
+    X = np.asarray(X, dtype=float)
+    centroides = np.empty((k, X.shape[1]))
+    centroides[0] = X[rng.integers(len(X))]
+    d2 = ((X - centroides[0]) ** 2).sum(axis=1)
+    for j in range(1, k):
+        total = d2.sum()
+        if total > 0:
+            i = min(int(np.searchsorted(np.cumsum(d2), rng.random() * total, side='right')), len(X) - 1)
+        else:
+            i = rng.integers(len(X))  # todos los puntos coinciden con algún centroide
+        centroides[j] = X[i]
+        np.minimum(d2, ((X - centroides[j]) ** 2).sum(axis=1), out=d2)
+    return centroides
+
+# --- Ejecución sin interfaz: resúmenes por iteración ---
+def ejecutar_k_medias(X_known, centroides, max_iter=20, motor=KernelKMedias):
+    kernel = motor(X_known, len(centroides))
+    historial = []
+    asign_prev = None
+    convergencia = False
+    for it in range(1, max_iter+1):
+        asign_idx = kernel.asignar(centroides)
+        movidos = None if asign_prev is None else int((asign_idx != asign_prev).sum())
+        historial.append({'iteracion': it, 'centroides': centroides,
+                          'asign_idx': asign_idx.astype(np.int32),
+                          'inercia': kernel.inercia(asign_idx),
+                          'distancias': kernel.calculadas,
+                          'movidos': movidos})
+        if asign_prev is not None and np.array_equal(asign_idx, asign_prev):
+            convergencia = True
+            break
+        asign_prev = asign_idx
+        centroides = kernel.recalcular_centroides(asign_idx, centroides)
+    return {'historial': historial, 'convergencia': convergencia, 'centroides': centroides,
+            'asign_idx': historial[-1]['asign_idx']}
+
+def inercia(X, centroides):
+    kernel = KernelKMedias(X, len(centroides))
+    return kernel.inercia(kernel.asignar(centroides))
+
+# --- Reinicios y barrido de k en paralelo ---
+# Las semillas de cada reinicio salen de SeedSequence(semilla).spawn: el resultado no
+# depende del número de trabajadores ni del orden en que terminan.
+_X_TRABAJADOR = None
+
+def _iniciar_trabajador(X):
+    global _X_TRABAJADOR
+    _X_TRABAJADOR = X
+
+def _en_trabajador(funcion, *args):
+    return funcion(_X_TRABAJADOR, *args)
+
+def _semillas(semilla, n):
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(semilla).spawn(n)]
+
+def _reinicio(X, k, semilla, max_iter, motor=KernelKMedias):
+    centroides = inicializar_kmeans_pp(X, k, np.random.default_rng(semilla))
+    return ejecutar_k_medias(X, centroides, max_iter, motor)
+
+def _inercia_reinicio(X, k, semilla, max_iter, motor=KernelKMedias):
+    return inercia(X, _reinicio(X, k, semilla, max_iter, motor)['centroides'])
+
+def _silueta(X, k, semilla, max_iter):
+    centroides = _reinicio(X, k, semilla, max_iter)['centroides']
+    asign_idx = KernelKMedias(X, k).asignar(centroides)
+    if len(np.unique(asign_idx)) < 2:
+        return float('nan')
+    from sklearn.metrics import silhouette_score
+    return float(silhouette_score(X, asign_idx))
+
+def _crear_pool(X, n_trabajadores):
+    if n_trabajadores is None or n_trabajadores <= 1:
+        return None
+    return ProcessPoolExecutor(n_trabajadores, initializer=_iniciar_trabajador, initargs=(X,))
+
+def _mapear(pool, X, funcion, tareas):
+    if pool is None:
+        return [funcion(X, *t) for t in tareas]
+    futuros = [pool.submit(_en_trabajador, funcion, *t) for t in tareas]
+    return [f.result() for f in futuros]
+
+def mejor_de_reinicios(X, k, n_reinicios=10, semilla=0, max_iter=20, n_trabajadores=None,
+                       motor=KernelKMedias):
+    X = np.asarray(X, dtype=float)
+    semillas = _semillas(semilla, n_reinicios)
+    pool = _crear_pool(X, n_trabajadores)
+    try:
+        inercias = _mapear(pool, X, _inercia_reinicio, [(k, s, max_iter, motor) for s in semillas])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    # Los trabajadores solo devuelven la inercia; el ganador (el primero en caso de
+    # empate) se repite aquí para conservar su historial
+    mejor = int(np.argmin(inercias))
+    return _reinicio(X, k, semillas[mejor], max_iter, motor), inercias
+
+def barrido_k(X, ks, n_reinicios=5, semilla=0, tam_muestra=5000, max_iter=20, n_trabajadores=None):
+    # Codo y silueta sobre una muestra; para cada k se usa el mejor de sus reinicios
+    import pandas as pd
+    X = np.asarray(X, dtype=float)
+    rng = np.random.default_rng(semilla)
+    if len(X) > tam_muestra:
+        X = X[np.sort(rng.choice(len(X), tam_muestra, replace=False))]
+    ks = [k for k in ks if 1 <= k <= len(X)]
+    semillas = _semillas(semilla, n_reinicios)
+    pool = _crear_pool(X, n_trabajadores)
+    try:
+        inercias = _mapear(pool, X, _inercia_reinicio,
+                           [(k, s, max_iter) for k in ks for s in semillas])
+        mejores = [int(np.argmin(inercias[i*n_reinicios:(i+1)*n_reinicios])) for i in range(len(ks))]
+        con_silueta = [(k, semillas[m]) for k, m in zip(ks, mejores) if 2 <= k < len(X)]
+        siluetas = dict(zip([k for k, _ in con_silueta],
+                            _mapear(pool, X, _silueta, [(k, s, max_iter) for k, s in con_silueta])))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return pd.DataFrame({
+        "k": ks,
+        "Inercia": [inercias[i*n_reinicios + m] for i, m in enumerate(mejores)],
+        "Silueta": [siluetas.get(k, float('nan')) for k in ks],
+    })
+
+# --- Imputación de filas incompletas ---
+def imputar_por_centroides(X, centroides, respaldo=0):
+    # Distancia enmascarada: Σ_obs (x − c)² = Σ_obs x² − 2·x_obs·c + Σ_obs c², con las
+    # celdas faltantes a 0 y la máscara de observados como pesos de c². Todo se centra en
+    # la media de los centroides para que un desplazamiento grande de los datos no se
+    # coma la precisión de la expansión
+    X = np.asarray(X, dtype=float)
+    centroides = np.asarray(centroides, dtype=float)
+    observado = ~np.isnan(X)
+    centro = centroides.mean(axis=0)
+    C = centroides - centro
+    Xo = np.where(observado, X - centro, 0.0)
+    norm_x = (Xo ** 2).sum(axis=1)
+    norm_c = observado @ (C ** 2).T
+    d2 = norm_x[:, None] - 2 * (Xo @ C.T) + norm_c
+    asign_idx = np.argmin(d2, axis=1)
+
+    if len(centroides) > 1:
+        # Como en KernelKMedias.asignar: los casi-empates se recalculan con las diferencias exactas
+        dos_menores = np.partition(d2, 1, axis=1)[:, :2]
+        cota = 16 * (X.shape[1] + 2) * np.finfo(np.float64).eps * (norm_x + norm_c.max(axis=1))
+        dudosas = np.flatnonzero(dos_menores[:, 1] - dos_menores[:, 0] <= 2 * cota)
+        if dudosas.size:
+            dif = np.where(observado[dudosas, None, :], X[dudosas, None, :] - centroides[None, :, :], 0.0)
+            asign_idx[dudosas] = np.argmin((dif ** 2).sum(axis=2), axis=1)
+    # Sin ninguna dimensión observada no hay distancia: se usa el cluster de respaldo
+    asign_idx[~observado.any(axis=1)] = respaldo
+    return asign_idx, np.where(observado, X, centroides[asign_idx])
+
+def resumen_iteraciones(historial):
+    import pandas as pd
+    return pd.DataFrame({
+        "Iteración": [h['iteracion'] for h in historial],
+        "Inercia": [h['inercia'] for h in historial],
+        "Puntos movidos": pd.array([h['movidos'] for h in historial], dtype="Int64"),
+        "Distancias calculadas": [h['distancias'] for h in historial],
+    })
+
+def proyectar_pca(X):
+    # Se ajusta una sola vez; todas las iteraciones reutilizan la misma proyección
+    from sklearn.decomposition import PCA
+    pca = PCA(n_components=2)
+    return pca, pca.fit_transform(X)
+
+# --- Mini-batch por bloques (CSV que no caben en memoria) ---
+def _leer_bloques(fuente, tam_bloque, usecols=None, na_values=None):
+    import pandas as pd
+    if hasattr(fuente, 'seek'):
+        fuente.seek(0)
+    # Con na_values solo esos valores son NA (la página pasa su política de NA)
+    opciones = {} if na_values is None else dict(keep_default_na=False, na_values=sorted(na_values))
+    return pd.read_csv(fuente, chunksize=tam_bloque, usecols=usecols, **opciones)
+
+def medias_por_clase_por_bloques(fuente, x_cols, cat_col, tam_bloque=200_000, na_values=None):
+    # Igual que inicializar_centroides_por_clase, acumulando sumas y conteos por bloque;
+    # las clases conservan el orden de primera aparición
+    sumas, conteos = {}, {}
+    for bloque in _leer_bloques(fuente, tam_bloque, x_cols + [cat_col], na_values):
+        grupos = bloque.dropna(subset=x_cols).groupby(cat_col, sort=False)[x_cols]
+        parciales = grupos.sum()
+        tamanos = grupos.size()
+        for clase in parciales.index:
+            sumas[clase] = sumas.get(clase, 0) + parciales.loc[clase].to_numpy(dtype=float)
+            conteos[clase] = conteos.get(clase, 0) + int(tamanos.loc[clase])
+    clases = list(sumas)
+    return np.vstack([sumas[c] / conteos[c] for c in clases]), np.array(clases)
+
+def k_medias_minibatch(fuente, x_cols, centroides, tam_bloque=200_000, tam_lote=1024,
+                       tam_muestra=10_000, semilla=0, na_values=None):
+    # Cada centroide avanza hacia la media de sus puntos en el lote con tasa
+    # (puntos del lote) / (puntos vistos): la media acumulada por cluster.
+    rng = np.random.default_rng(semilla)
+    centroides = np.array(centroides, dtype=float, copy=True)
+    k = len(centroides)
+    vistos = np.zeros(k)
+    filas = 0
+    muestra = np.empty((0, len(x_cols)))
+    prioridades = np.empty(0)
+    for bloque in _leer_bloques(fuente, tam_bloque, x_cols, na_values):
+        X = bloque[x_cols].dropna().to_numpy(dtype=float)
+        filas += len(X)
+
+        # Muestra uniforme por prioridades aleatorias para medir la calidad después
+        muestra = np.concatenate([muestra, X])
+        prioridades = np.concatenate([prioridades, rng.random(len(X))])
+        if len(prioridades) > tam_muestra:
+            keep = np.argpartition(prioridades, tam_muestra)[:tam_muestra]
+            muestra, prioridades = muestra[keep], prioridades[keep]
+
+        X = X[rng.permutation(len(X))]
+        for inicio in range(0, len(X), tam_lote):
+            lote = X[inicio:inicio + tam_lote]
+            asign_idx = KernelKMedias(lote, k).asignar(centroides)
+            conteos = np.bincount(asign_idx, minlength=k)
+            sumas = np.column_stack([np.bincount(asign_idx, weights=lote[:, j], minlength=k)
+                                     for j in range(lote.shape[1])])
+            vistos += conteos
+            activos = conteos > 0
+            tasa = conteos[activos] / vistos[activos]
+            medias = sumas[activos] / conteos[activos, None]
+            centroides[activos] += tasa[:, None] * (medias - centroides[activos])
+    return centroides, muestra, filas
+
+def asignar_por_bloques(fuente, x_cols, centroides, clases, destino, tam_bloque=200_000, na_values=None):
+    filas = 0
+    with open(destino, 'w', newline='', encoding='utf-8') as salida:
+        for i, bloque in enumerate(_leer_bloques(fuente, tam_bloque, na_values=na_values)):
+            completas = bloque[x_cols].notna().all(axis=1).to_numpy()
+            etiquetas = np.full(len(bloque), None, dtype=object)
+            if completas.any():
+                X = bloque.loc[completas, x_cols].to_numpy(dtype=float)
+                etiquetas[completas] = clases[KernelKMedias(X, len(centroides)).asignar(centroides)]
+            if not completas.all():
+                # Como en memoria: centroide más cercano en las dimensiones observadas
+                asign_idx, X_imputado = imputar_por_centroides(
+                    bloque.loc[~completas, x_cols].to_numpy(dtype=float), centroides)
+                bloque.loc[~completas, x_cols] = X_imputado
+                etiquetas[~completas] = clases[asign_idx]
+            bloque["Cluster asignado"] = etiquetas
+            bloque.to_csv(salida, header=(i == 0), index=False)
+            filas += len(bloque)
+    return filas
+
+def ejecutar_por_bloques(fuente, x_cols, cat_col, k, tam_lote, destino, tam_bloque=200_000, semilla=0,
+                         na_values=None):
+    inicio = time.perf_counter()
+    if cat_col:
+        iniciales, clases = medias_por_clase_por_bloques(fuente, x_cols, cat_col, tam_bloque, na_values)
+    else:
+        primero = next(iter(_leer_bloques(fuente, tam_bloque, x_cols, na_values)))
+        iniciales = inicializar_kmeans_pp(primero.dropna().to_numpy(dtype=float), k,
+                                          np.random.default_rng(semilla))
+        clases = np.arange(k)
+    centroides, muestra, filas = k_medias_minibatch(fuente, x_cols, iniciales, tam_bloque, tam_lote,
+                                                    semilla=semilla, na_values=na_values)
+
+    # Brecha de calidad frente a K-medias completo sobre la muestra, con la misma inicialización
+    completo = ejecutar_k_medias(muestra, iniciales)
+    inercia_minibatch = inercia(muestra, centroides)
+    inercia_completo = inercia(muestra, completo['centroides'])
+
+    asignar_por_bloques(fuente, x_cols, centroides, clases, destino, tam_bloque, na_values)
+    return {'centroides': centroides, 'clases': clases, 'filas': filas, 'muestra': len(muestra),
+            'inercia_minibatch': inercia_minibatch, 'inercia_completo': inercia_completo,
+            'segundos': time.perf_counter() - inicio}
+
+# --- Ajuste y predicción sin interfaz ---
+def ajustar(X, k=None, centroides=None, n_reinicios=10, semilla=0, max_iter=20, n_trabajadores=None,
+            motor=KernelKMedias):
+    # Con centroides iniciales se ejecuta una sola vez; si no, el mejor de n_reinicios
+    # con k-means++. El historial del resultado es la traza de las iteraciones.
+    if centroides is not None:
+        resultado = ejecutar_k_medias(X, centroides, max_iter, motor)
+        resultado['inercias'] = None
+        return resultado
+    resultado, inercias = mejor_de_reinicios(X, k, n_reinicios, semilla, max_iter, n_trabajadores, motor)
+    resultado['inercias'] = inercias
+    return resultado
+
+def predecir(centroides, X, respaldo=0):
+    # Centroide más cercano; las filas con NaN se comparan solo en sus dimensiones observadas
+    X = np.asarray(X, dtype=float)
+    completas = ~np.isnan(X).any(axis=1)
+    asign_idx = np.full(len(X), respaldo, dtype=np.intp)
+    if completas.any():
+        asign_idx[completas] = KernelKMedias(X[completas], len(centroides)).asignar(centroides)
+    if not completas.all():
+        asign_idx[~completas] = imputar_por_centroides(X[~completas], centroides, respaldo)[0]
+    return asign_idx
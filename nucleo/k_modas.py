@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+# K-modas sin interfaz: codificación, tablas de frecuencia, iteraciones e imputación.
+
+# --- Codificación entera y distancias de Hamming por difusión ---
+def codificar(serie, categorias=None):
+    # Códigos enteros contiguos; si se dan las categorías, el código es su posición en ellas
+    if categorias is None:
+        codigos, categorias = pd.factorize(serie)
+        return codigos, pd.Index(categorias)
+    return pd.Index(categorias).get_indexer(serie), pd.Index(categorias)
+
+def distancias_hamming(codigos, modas_cod, observado=None):
+    # codigos: n×m, modas_cod: k×m → n×k con el número de atributos distintos de cada moda.
+    # Se acumula atributo a atributo para no materializar un n×k×m; con `observado`
+    # solo cuentan las celdas no faltantes
+    dist = np.zeros((len(codigos), len(modas_cod)), dtype=np.int64)
+    for j in range(codigos.shape[1]):
+        distinto = codigos[:, j, None] != modas_cod[None, :, j]
+        if observado is not None:
+            distinto &= observado[:, j, None]
+        dist += distinto
+    return dist
+
+# --- Tablas de frecuencia (cluster × valor) por atributo ---
+# Por encima de este número de valores distintos un atributo guarda solo los pares
+# (cluster, valor) observados en lugar de la tabla densa k×v
+UMBRAL_DISPERSO = 5000
+
+class TablaDispersa:
+    # Claves ordenadas cluster·v + código con su conteo; los pares a cero se eliminan
+    def __init__(self, codigos, asign_idx, k, v):
+        self.k = k
+        self.v = v
+        self.claves, self.conteos = np.unique(np.asarray(asign_idx, dtype=np.int64) * v + codigos,
+                                              return_counts=True)
+
+    def mover(self, codigos, antes, despues):
+        salen = np.searchsorted(self.claves, np.asarray(antes, dtype=np.int64) * self.v + codigos)
+        np.subtract.at(self.conteos, salen, 1)
+
+        entran, cuantos = np.unique(np.asarray(despues, dtype=np.int64) * self.v + codigos,
+                                    return_counts=True)
+        pos = np.searchsorted(self.claves, entran)
+        existe = pos < len(self.claves)
+        existe[existe] = self.claves[pos[existe]] == entran[existe]
+        self.conteos[pos[existe]] += cuantos[existe]
+        if not existe.all():
+            self.claves = np.insert(self.claves, pos[~existe], entran[~existe])
+            self.conteos = np.insert(self.conteos, pos[~existe], cuantos[~existe])
+
+        vivos = self.conteos > 0
+        if not vivos.all():
+            self.claves = self.claves[vivos]
+            self.conteos = self.conteos[vivos]
+
+    def modas(self):
+        # Por cluster, el primer código (el menor) con el conteo máximo, igual que argmax
+        modas = np.zeros(self.k, dtype=np.int64)
+        if len(self.claves) == 0:
+            return modas
+        clusters = self.claves // self.v
+        inicios = np.flatnonzero(np.r_[True, clusters[1:] != clusters[:-1]])
+        maximos = np.maximum.reduceat(self.conteos, inicios)
+        candidatos = np.flatnonzero(self.conteos == np.repeat(maximos, np.diff(np.r_[inicios, len(clusters)])))
+        primeros = candidatos[np.r_[True, clusters[candidatos][1:] != clusters[candidatos][:-1]]]
+        modas[clusters[primeros]] = self.claves[primeros] % self.v
+        return modas
+
+    def ventana(self, inicio, fin):
+        codigos = self.claves % self.v
+        dentro = (codigos >= inicio) & (codigos < fin)
+        conteo = np.zeros((fin - inicio, self.k), dtype=np.int64)
+        conteo[codigos[dentro] - inicio, self.claves[dentro] // self.v] = self.conteos[dentro]
+        return conteo
+
+class TablasFrecuencia:
+    # Las tablas densas viven en un único array plano: la del atributo j ocupa k·v_j
+    # posiciones a partir de su desplazamiento, con índice cluster·v_j + código.
+    # Los atributos con más de `umbral` valores usan una TablaDispersa.
+    def __init__(self, codigos, asign_idx, k, n_categorias, umbral=UMBRAL_DISPERSO):
+        self.k = k
+        self.n_categorias = np.asarray(n_categorias, dtype=np.int64)
+        asign_idx = np.asarray(asign_idx, dtype=np.int64)
+        self.tamanos = np.bincount(asign_idx, minlength=k)
+        self.densos = np.flatnonzero(self.n_categorias <= umbral)
+        self.dispersos = {j: TablaDispersa(codigos[:, j], asign_idx, k, self.n_categorias[j])
+                          for j in np.flatnonzero(self.n_categorias > umbral)}
+
+        tamanos = k * self.n_categorias[self.densos]
+        self.desplazamientos = np.zeros(len(self.n_categorias), dtype=np.int64)
+        self.desplazamientos[self.densos] = np.concatenate(([0], np.cumsum(tamanos)[:-1]))
+        self.plana = np.bincount(self._indices(codigos, asign_idx).ravel(), minlength=int(tamanos.sum()))
+
+    def _indices(self, codigos, asign_idx):
+        d = self.densos
+        return self.desplazamientos[d] + asign_idx[:, None] * self.n_categorias[d] + codigos[:, d]
+
+    def mover(self, codigos, antes, despues):
+        # Solo se tocan los puntos que cambiaron de cluster
+        antes = np.asarray(antes, dtype=np.int64)
+        despues = np.asarray(despues, dtype=np.int64)
+        np.subtract.at(self.plana, self._indices(codigos, antes).ravel(), 1)
+        np.add.at(self.plana, self._indices(codigos, despues).ravel(), 1)
+        for j, tabla in self.dispersos.items():
+            tabla.mover(codigos[:, j], antes, despues)
+        self.tamanos += np.bincount(despues, minlength=self.k) - np.bincount(antes, minlength=self.k)
+
+    def tabla(self, j):
+        inicio = self.desplazamientos[j]
+        return self.plana[inicio:inicio + self.k * self.n_categorias[j]].reshape(self.k, -1)
+
+    def ventana(self, j, inicio, fin):
+        # Conteos de los valores [inicio, fin) del atributo j, valores × clusters
+        if j in self.dispersos:
+            return self.dispersos[j].ventana(inicio, fin)
+        return self.tabla(j)[:, inicio:fin].T
+
+    def modas(self, anteriores=None):
+        # argmax devuelve el primer máximo: en empate gana el valor que aparece antes en los datos
+        modas_cod = np.column_stack([self.dispersos[j].modas() if j in self.dispersos
+                                     else self.tabla(j).argmax(axis=1)
+                                     for j in range(len(self.n_categorias))])
+        if anteriores is not None:
+            vacios = self.tamanos == 0
+            modas_cod[vacios] = anteriores[vacios]   # un cluster vacío conserva su moda
+        return modas_cod
+
+# --- Ejecución sin interfaz ---
+def ejecutar_k_modas(codigos, modas_cod, n_categorias, max_iter=20):
+    k = len(modas_cod)
+    filas = np.arange(len(codigos))
+    historial = []
+    asign_prev = None
+    tablas = None
+    convergencia = False
+    for it in range(1, max_iter+1):
+        dist = distancias_hamming(codigos, modas_cod)
+        asign_idx = np.argmin(dist, axis=1)
+        movidos = None if asign_prev is None else int((asign_idx != asign_prev).sum())
+        historial.append({'iteracion': it, 'modas_cod': modas_cod,
+                          'asign_idx': asign_idx.astype(np.int32),
+                          'coste': int(dist[filas, asign_idx].sum()), 'movidos': movidos})
+        if asign_prev is not None and np.array_equal(asign_idx, asign_prev):
+            convergencia = True
+            break
+
+        if tablas is None:
+            tablas = TablasFrecuencia(codigos, asign_idx, k, n_categorias)
+        else:
+            cambiados = np.flatnonzero(asign_idx != asign_prev)
+            tablas.mover(codigos[cambiados], asign_prev[cambiados], asign_idx[cambiados])
+        asign_prev = asign_idx
+        modas_cod = tablas.modas(modas_cod)
+    return {'historial': historial, 'convergencia': convergencia, 'modas_cod': modas_cod,
+            'asign_idx': historial[-1]['asign_idx'], 'tablas': tablas}
+
+def resumen_iteraciones(historial):
+    return pd.DataFrame({
+        "Iteración": [h['iteracion'] for h in historial],
+        "Coste (atributos distintos)": [h['coste'] for h in historial],
+        "Puntos movidos": pd.array([h['movidos'] for h in historial], dtype="Int64"),
+    })
+
+def modas_a_tabla(modas_cod, categorias, atributos, clases):
+    modas_df = pd.DataFrame({col: categorias[j][modas_cod[:, j]] for j, col in enumerate(atributos)},
+                            index=clases)
+    modas_df.index.name = "Cluster"
+    return modas_df
+
+def codificar_columnas(df, atributos, categorias):
+    return np.column_stack([codificar(df[col], categorias[j])[0] for j, col in enumerate(atributos)])
+
+def asignar_por_modas(df, atributos, categorias, modas_cod, respaldo=0):
+    # Moda más cercana en los atributos observados; un valor no visto al entrenar cuenta
+    # como distinto y una fila sin ningún atributo observado va al cluster de respaldo
+    observado = df[atributos].notna().to_numpy()
+    asign_idx = np.argmin(distancias_hamming(codificar_columnas(df, atributos, categorias), modas_cod,
+                                             observado), axis=1)
+    asign_idx[~observado.any(axis=1)] = respaldo
+    return asign_idx, observado
+
+def imputar_por_modas(df_missing, atributos, categorias, modas_cod, respaldo=0):
+    # Solo se rellenan las celdas vacías, con la moda del cluster asignado
+    asign_idx, observado = asignar_por_modas(df_missing, atributos, categorias, modas_cod, respaldo)
+    imputado = df_missing.copy()
+    for j, col in enumerate(atributos):
+        faltan = ~observado[:, j]
+        if faltan.any():
+            imputado[col] = imputado[col].astype(object)
+            imputado.loc[faltan, col] = categorias[j][modas_cod[asign_idx[faltan], j]].to_numpy()
+    return imputado, asign_idx
+
+def es_categorica(serie):
+    return (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+            or isinstance(serie.dtype, pd.CategoricalDtype))
+
+# --- Ajuste y predicción sin interfaz ---
+def ajustar(df, atributos, clase_col, max_iter=20):
+    # df sin faltantes en atributos ni en clase_col. Los atributos se codifican una sola
+    # vez y las modas iniciales salen de las tablas de frecuencia por clase_col
+    codificados = [codificar(df[col]) for col in atributos]
+    codigos = np.column_stack([c for c, _ in codificados])
+    categorias = [cat for _, cat in codificados]
+    n_categorias = [len(cat) for cat in categorias]
+    cod_clase, clases = codificar(df[clase_col])
+    iniciales = TablasFrecuencia(codigos, cod_clase, len(clases), n_categorias)
+    modelo = ejecutar_k_modas(codigos, iniciales.modas(), n_categorias, max_iter)
+    modelo.update({'atributos': list(atributos), 'categorias': categorias, 'clases': clases,
+                   'iniciales': iniciales})
+    return modelo
+
+def predecir(modelo, df, respaldo=0):
+    return asignar_por_modas(df, modelo['atributos'], modelo['categorias'], modelo['modas_cod'], respaldo)[0]
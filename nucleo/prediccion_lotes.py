@@ -0,0 +1,26 @@
+import time
+
+from nucleo.regresion_multiple import predecir
+
+def _bloques(fuente, nombre, tam_bloque):
+    import pandas as pd
+    if nombre.endswith(".xlsx"):
+        # Excel no se puede leer por partes: se procesa como un único bloque
+        yield pd.read_excel(fuente)
+        return
+    yield from pd.read_csv(fuente, chunksize=tam_bloque)
+
+def predecir_por_bloques(fuente, nombre, x_cols, beta, destino, col_prediccion, tam_bloque=200_000):
+    # beta[0] es el intercepto; beta[1:] sigue el orden de x_cols
+    inicio = time.perf_counter()
+    filas = 0
+    with open(destino, 'w', newline='', encoding='utf-8') as salida:
+        for i, bloque in enumerate(_bloques(fuente, nombre, tam_bloque)):
+            if i == 0:
+                faltantes = [c for c in x_cols if c not in bloque.columns]
+                if faltantes:
+                    raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+            bloque[col_prediccion] = predecir(beta, bloque[x_cols].to_numpy(dtype=float))
+            bloque.to_csv(salida, header=(i == 0), index=False)
+            filas += len(bloque)
+    return filas, time.perf_counter() - inicio
@@ -0,0 +1,193 @@
+import json
+
+import numpy as np
+
+# Regresión lineal simple sin interfaz. pandas solo se importa en las funciones que
+# leen CSV o devuelven tablas: el ajuste y la predicción dependen únicamente de numpy.
+
+# --- Estadísticos suficientes (actualización estable por bloques) ---
+class EstadisticosRegresion:
+    def __init__(self):
+        self.n = 0
+        self.media_x = 0.0
+        self.media_y = 0.0
+        self.m2_x = 0.0   # Σ(X - X̄)²
+        self.m2_y = 0.0   # Σ(Y - Ȳ)²
+        self.c_xy = 0.0   # Σ(X - X̄)(Y - Ȳ)
+
+    @classmethod
+    def desde_arrays(cls, X, Y):
+        est = cls()
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        est.n = len(X)
+        if est.n:
+            est.media_x = float(X.mean())
+            est.media_y = float(Y.mean())
+            dx = X - est.media_x
+            dy = Y - est.media_y
+            est.m2_x = float(dx @ dx)
+            est.m2_y = float(dy @ dy)
+            est.c_xy = float(dx @ dy)
+        return est
+
+    def combinar(self, otro):
+        # Fórmula de Chan et al. para unir medias y co-momentos de dos bloques
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(otro.__dict__)
+            return self
+        n = self.n + otro.n
+        dx = otro.media_x - self.media_x
+        dy = otro.media_y - self.media_y
+        factor = self.n * otro.n / n
+        self.media_x += dx * otro.n / n
+        self.media_y += dy * otro.n / n
+        self.m2_x += otro.m2_x + dx * dx * factor
+        self.m2_y += otro.m2_y + dy * dy * factor
+        self.c_xy += otro.c_xy + dx * dy * factor
+        self.n = n
+        return self
+
+    def actualizar(self, X, Y):
+        return self.combinar(EstadisticosRegresion.desde_arrays(X, Y))
+
+    @property
+    def sum_x(self):
+        return self.n * self.media_x
+
+    @property
+    def sum_y(self):
+        return self.n * self.media_y
+
+    @property
+    def sum_x2(self):
+        return self.m2_x + self.n * self.media_x ** 2
+
+    @property
+    def sum_xy(self):
+        return self.c_xy + self.n * self.media_x * self.media_y
+
+    def coeficientes(self):
+        if self.m2_x == 0:
+            raise ValueError("La variable independiente es constante (o no hay filas): la pendiente no está definida.")
+        beta_1 = self.c_xy / self.m2_x
+        beta_0 = self.media_y - beta_1 * self.media_x
+        return beta_0, beta_1
+
+    def a_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def desde_dict(cls, d):
+        est = cls()
+        est.__dict__.update({k: d[k] for k in est.__dict__})
+        return est
+
+# --- Estadísticos exportables (para combinar fragmentos procesados por separado) ---
+def exportar_estadisticos(est, x_col, y_col):
+    datos = {'tipo': 'regresion_lineal', 'x_col': x_col, 'y_col': y_col, 'estadisticos': est.a_dict()}
+    return json.dumps(datos, ensure_ascii=False).encode('utf-8')
+
+def importar_estadisticos(datos):
+    d = json.loads(datos)
+    if d.get('tipo') != 'regresion_lineal':
+        raise ValueError("El archivo no contiene estadísticos de regresión lineal simple.")
+    return EstadisticosRegresion.desde_dict(d['estadisticos']), d['x_col'], d['y_col']
+
+def tabla_pasos(X, Y, x_col, y_col):
+    import pandas as pd
+    return pd.DataFrame({
+        x_col: X,
+        y_col: Y,
+        f"{x_col}^2": X**2,
+        f"{x_col}*{y_col}": X * Y
+    })
+
+def estadisticos_por_bloques(fuente, x_col, y_col, tam_bloque=200_000, tam_muestra=1000, semilla=0):
+    # Una sola pasada: memoria constante salvo la muestra para la tabla de pasos
+    import pandas as pd
+    est = EstadisticosRegresion()
+    rng = np.random.default_rng(semilla)
+    filas = np.empty(0, dtype=np.int64)
+    xs = np.empty(0)
+    ys = np.empty(0)
+    prioridades = np.empty(0)
+    for bloque in pd.read_csv(fuente, usecols=[x_col, y_col], chunksize=tam_bloque):
+        bloque = bloque.dropna()
+        X = bloque[x_col].to_numpy(dtype=float)
+        Y = bloque[y_col].to_numpy(dtype=float)
+        est.actualizar(X, Y)
+
+        # Muestreo uniforme por prioridades aleatorias (las tam_muestra menores)
+        filas = np.concatenate([filas, bloque.index.to_numpy()])
+        xs = np.concatenate([xs, X])
+        ys = np.concatenate([ys, Y])
+        prioridades = np.concatenate([prioridades, rng.random(len(X))])
+        if len(prioridades) > tam_muestra:
+            keep = np.argpartition(prioridades, tam_muestra)[:tam_muestra]
+            filas, xs, ys, prioridades = filas[keep], xs[keep], ys[keep], prioridades[keep]
+
+    orden = np.argsort(filas)
+    muestra = tabla_pasos(xs[orden], ys[orden], x_col, y_col)
+    muestra.index = filas[orden]
+    return est, muestra
+
+# --- Todos los pares a partir de una sola matriz de co-momentos ---
+def comomentos_por_bloques(X, tam_bloque=100_000):
+    X = np.asarray(X, dtype=float)
+    n = 0
+    medias = np.zeros(X.shape[1])
+    C = np.zeros((X.shape[1], X.shape[1]))   # Σ(X - X̄)ᵀ(X - X̄)
+    for i in range(0, len(X), tam_bloque):
+        B = X[i:i + tam_bloque]
+        n_b = len(B)
+        media_b = B.mean(axis=0)
+        d = B - media_b
+        delta = media_b - medias
+        total = n + n_b
+        C += d.T @ d + np.outer(delta, delta) * (n * n_b / total)
+        medias += delta * n_b / total
+        n = total
+    return n, medias, C
+
+def matrices_pares(medias, C, columnas):
+    # Fila = X, columna = Y: β₁ = Cxy/Cxx, β₀ = Ȳ - β₁X̄, R² = Cxy²/(Cxx·Cyy)
+    import pandas as pd
+    var = np.diag(C).copy()
+    var[var == 0] = np.nan
+    beta_1 = C / var[:, None]
+    beta_0 = medias[None, :] - beta_1 * medias[:, None]
+    r2 = C ** 2 / np.outer(var, var)
+    np.fill_diagonal(beta_1, np.nan)
+    np.fill_diagonal(beta_0, np.nan)
+    np.fill_diagonal(r2, np.nan)
+    como_df = lambda m: pd.DataFrame(m, index=columnas, columns=columnas)
+    return como_df(beta_0), como_df(beta_1), como_df(r2)
+
+def estadisticos_de_par(pares, x_col, y_col):
+    i = pares['columnas'].index(x_col)
+    j = pares['columnas'].index(y_col)
+    est = EstadisticosRegresion()
+    est.n = pares['n']
+    est.media_x = float(pares['medias'][i])
+    est.media_y = float(pares['medias'][j])
+    est.m2_x = float(pares['C'][i, i])
+    est.m2_y = float(pares['C'][j, j])
+    est.c_xy = float(pares['C'][i, j])
+    return est
+
+# --- Ajuste, predicción y traza sin interfaz ---
+def ajustar(X, Y):
+    return EstadisticosRegresion.desde_arrays(X, Y)
+
+def predecir(beta, X):
+    # beta = (β₀, β₁)
+    return beta[0] + beta[1] * np.asarray(X, dtype=float)
+
+def traza(est):
+    # Valores de cada paso del cálculo tal como los muestra la página
+    beta_0, beta_1 = est.coeficientes()
+    return {'media_x': est.media_x, 'media_y': est.media_y, 'sum_x': est.sum_x, 'sum_y': est.sum_y,
+            'sum_x2': est.sum_x2, 'sum_xy': est.sum_xy, 'n': est.n, 'beta_0': beta_0, 'beta_1': beta_1}
@@ -0,0 +1,172 @@
+import json
+
+import numpy as np
+
+# Regresión lineal múltiple sin interfaz. Como en la simple, pandas solo se importa
+# en las funciones que leen CSV o construyen tablas.
+
+# --- Estadísticos suficientes (acumulables por bloques y sumables entre fragmentos) ---
+# Se guardan medias y co-momentos centrados: X_bᵀX_b y X_bᵀY se derivan de ellos
+# sin perder precisión cuando las columnas tienen un gran desplazamiento.
+class EstadisticosMultiples:
+    def __init__(self, k):
+        self.n = 0
+        self.media_x = np.zeros(k)
+        self.media_y = 0.0
+        self.cxx = np.zeros((k, k))   # Σ(X - X̄)ᵀ(X - X̄)
+        self.cxy = np.zeros(k)        # Σ(X - X̄)(Y - Ȳ)
+        self.cyy = 0.0                # Σ(Y - Ȳ)²
+
+    @classmethod
+    def _desde_bloque(cls, X, Y):
+        est = cls(X.shape[1])
+        est.n = len(X)
+        if est.n:
+            est.media_x = X.mean(axis=0)
+            est.media_y = float(Y.mean())
+            dx = X - est.media_x
+            dy = Y - est.media_y
+            est.cxx = dx.T @ dx
+            est.cxy = dx.T @ dy
+            est.cyy = float(dy @ dy)
+        return est
+
+    @classmethod
+    def desde_arrays(cls, X, Y, tam_bloque=100_000):
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float).ravel()
+        est = cls(X.shape[1])
+        # Por bloques de filas: la memoria temporal no crece con n
+        for i in range(0, len(X), tam_bloque):
+            est.combinar(cls._desde_bloque(X[i:i + tam_bloque], Y[i:i + tam_bloque]))
+        return est
+
+    def combinar(self, otro):
+        # Fórmula de Chan et al. en forma matricial
+        if self.cxx.shape != otro.cxx.shape:
+            raise ValueError("Los estadísticos tienen distinto número de variables.")
+        if otro.n == 0:
+            return self
+        n = self.n + otro.n
+        dx = otro.media_x - self.media_x
+        dy = otro.media_y - self.media_y
+        factor = self.n * otro.n / n
+        self.media_x = self.media_x + dx * otro.n / n
+        self.media_y += dy * otro.n / n
+        self.cxx = self.cxx + otro.cxx + np.outer(dx, dx) * factor
+        self.cxy = self.cxy + otro.cxy + dx * dy * factor
+        self.cyy += otro.cyy + dy * dy * factor
+        self.n = n
+        return self
+
+    def actualizar(self, X, Y):
+        return self.combinar(EstadisticosMultiples.desde_arrays(X, Y))
+
+    @property
+    def xtx(self):
+        k = len(self.media_x)
+        sumas = self.n * self.media_x
+        m = np.empty((k + 1, k + 1))
+        m[0, 0] = self.n
+        m[0, 1:] = m[1:, 0] = sumas
+        m[1:, 1:] = self.cxx + self.n * np.outer(self.media_x, self.media_x)
+        return m
+
+    @property
+    def xty(self):
+        return np.concatenate([[self.n * self.media_y],
+                               self.cxy + self.n * self.media_x * self.media_y])
+
+    @property
+    def yty(self):
+        return self.cyy + self.n * self.media_y ** 2
+
+    def coeficientes(self):
+        return resolver_minimos_cuadrados(self)['beta']
+
+    def a_dict(self):
+        return {'n': self.n, 'media_x': self.media_x.tolist(), 'media_y': self.media_y,
+                'cxx': self.cxx.tolist(), 'cxy': self.cxy.tolist(), 'cyy': self.cyy}
+
+    @classmethod
+    def desde_dict(cls, d):
+        est = cls(len(d['media_x']))
+        est.n = d['n']
+        est.media_x = np.array(d['media_x'], dtype=float)
+        est.media_y = float(d['media_y'])
+        est.cxx = np.array(d['cxx'], dtype=float)
+        est.cxy = np.array(d['cxy'], dtype=float)
+        est.cyy = float(d['cyy'])
+        return est
+
+# --- Resolución sin inversa explícita ---
+def resolver_minimos_cuadrados(est, metodo='auto', max_condicion=1e12):
+    # Se trabaja con la matriz de correlaciones (centrada y escalada) para acotar el
+    # número de condición; el intercepto se recupera a partir de las medias.
+    k = len(est.media_x)
+    escala = np.sqrt(np.diag(est.cxx))
+    escala[escala == 0] = 1.0
+    R = est.cxx / np.outer(escala, escala)
+    b = est.cxy / escala
+    condicion = float(np.linalg.cond(R)) if k else 1.0
+
+    usado = None
+    rango = k
+    if metodo == 'cholesky' or (metodo == 'auto' and condicion < max_condicion):
+        try:
+            L = np.linalg.cholesky(R)
+            pendientes = np.linalg.solve(L.T, np.linalg.solve(L, b))
+            usado = 'cholesky'
+        except np.linalg.LinAlgError:
+            if metodo == 'cholesky':
+                raise
+    if usado is None:
+        # Datos con deficiencia de rango o casi colineales: solución de norma mínima (SVD)
+        pendientes, _, rango, _ = np.linalg.lstsq(R, b, rcond=None)
+        usado = 'lstsq'
+    pendientes = pendientes / escala
+    beta = np.concatenate([[est.media_y - est.media_x @ pendientes], pendientes])
+    return {'beta': beta, 'metodo': usado, 'condicion': condicion, 'rango': int(rango)}
+
+def estadisticos_por_bloques(fuente, x_cols, y_col, tam_bloque=200_000, tam_vista=1000):
+    import pandas as pd
+    est = EstadisticosMultiples(len(x_cols))
+    vista = None
+    for bloque in pd.read_csv(fuente, usecols=list(x_cols) + [y_col], chunksize=tam_bloque):
+        bloque = bloque.dropna()
+        est.actualizar(bloque[x_cols].to_numpy(dtype=float), bloque[y_col].to_numpy(dtype=float))
+        if vista is None:
+            vista = bloque.head(tam_vista)
+    return est, vista
+
+def exportar_estadisticos(est, x_cols, y_col):
+    datos = {'tipo': 'regresion_multiple', 'x_cols': list(x_cols), 'y_col': y_col,
+             'estadisticos': est.a_dict()}
+    return json.dumps(datos, ensure_ascii=False).encode('utf-8')
+
+def importar_estadisticos(datos):
+    d = json.loads(datos)
+    if d.get('tipo') != 'regresion_multiple':
+        raise ValueError("El archivo no contiene estadísticos de regresión múltiple.")
+    return EstadisticosMultiples.desde_dict(d['estadisticos']), d['x_cols'], d['y_col']
+
+# --- Ajuste y predicción sin interfaz ---
+def ajustar(X, Y):
+    return EstadisticosMultiples.desde_arrays(X, Y)
+
+def traza(est):
+    # Valores de cada paso del cálculo tal como los muestra la página
+    solucion = resolver_minimos_cuadrados(est)
+    return {'xtx': est.xtx, 'xty': est.xty, 'n': est.n, 'beta': solucion['beta'],
+            'metodo': solucion['metodo'], 'condicion': solucion['condicion'], 'rango': solucion['rango']}
+
+def predecir(beta, X):
+    # beta[0] es el intercepto; beta[1:] sigue el orden de las columnas de X
+    beta = np.asarray(beta, dtype=float)
+    return np.asarray(X, dtype=float) @ beta[1:] + beta[0]
+
+def matriz_diseno(datos, x_cols, indice=None):
+    import pandas as pd
+    X_b = pd.DataFrame(datos[x_cols].to_numpy(), columns=x_cols, index=indice)
+    X_b.insert(0, "Intercepto", 1.0)
+    return X_b
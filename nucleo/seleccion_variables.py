@@ -0,0 +1,196 @@
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Selección de variables para regresión múltiple a partir de un único
+# EstadisticosMultiples: cada modelo candidato se resuelve con submatrices de la
+# matriz de Gram (centrada y escalada), sin volver a leer los datos. Como en los
+# núcleos de regresión, pandas y scipy solo se importan en las funciones que los usan.
+
+MAX_EXHAUSTIVA = 20
+TOLERANCIA_COLINEAL = 1e-10
+
+def _sistema_escalado(est):
+    escala = np.sqrt(np.diag(est.cxx))
+    escala[escala == 0] = 1.0
+    return est.cxx / np.outer(escala, escala), est.cxy / escala, est.cyy
+
+def _metricas(rss, p, n, syy):
+    rss = max(rss, 0.0)
+    r2 = 1 - rss / syy if syy > 0 else 0.0
+    r2_aj = 1 - (1 - r2) * (n - 1) / (n - p - 1) if n - p - 1 > 0 else float('nan')
+    aic = n * math.log(rss / n) + 2 * (p + 1) if rss > 0 and n > 0 else float('-inf')
+    return r2, r2_aj, aic
+
+def _extender(R, b, L, z, indices, j):
+    # Añade la variable j a la factorización de Cholesky L de R[indices, indices].
+    # z = L⁻¹ b[indices], de modo que RSS = syy - zᵀz.
+    from scipy.linalg import solve_triangular
+    p = len(indices)
+    if p:
+        l = solve_triangular(L, R[indices, j], lower=True)
+        d2 = R[j, j] - l @ l
+    else:
+        l = np.zeros(0)
+        d2 = R[j, j]
+    if d2 <= TOLERANCIA_COLINEAL * max(R[j, j], 1.0):
+        return None  # j es (casi) combinación lineal de las ya incluidas
+    d = math.sqrt(d2)
+    L_nueva = np.zeros((p + 1, p + 1))
+    L_nueva[:p, :p] = L
+    L_nueva[p, :p] = l
+    L_nueva[p, p] = d
+    return L_nueva, np.append(z, (b[j] - l @ z) / d)
+
+# --- Mejor subconjunto (exhaustiva) ---
+def _registrar(mejores, subconjunto, rss, por_tamano):
+    heap = mejores.setdefault(len(subconjunto), [])
+    item = (-rss, subconjunto)
+    if len(heap) < por_tamano:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+def _explorar(R, b, syy, prefijo, L, z, mejores, por_tamano):
+    # Recorrido en profundidad: cada hijo extiende la factorización del padre
+    inicio = prefijo[-1] + 1 if prefijo else 0
+    for j in range(inicio, len(b)):
+        ext = _extender(R, b, L, z, list(prefijo), j)
+        if ext is None:
+            continue
+        L_j, z_j = ext
+        sub = prefijo + (j,)
+        _registrar(mejores, sub, syy - z_j @ z_j, por_tamano)
+        _explorar(R, b, syy, sub, L_j, z_j, mejores, por_tamano)
+
+def _tarea_exhaustiva(R, b, syy, prefijo, explorar, por_tamano):
+    L, z = np.zeros((0, 0)), np.zeros(0)
+    for i, j in enumerate(prefijo):
+        ext = _extender(R, b, L, z, list(prefijo[:i]), j)
+        if ext is None:
+            return {}
+        L, z = ext
+    mejores = {}
+    if prefijo:
+        _registrar(mejores, prefijo, syy - z @ z, por_tamano)
+    if explorar:
+        _explorar(R, b, syy, prefijo, L, z, mejores, por_tamano)
+    return mejores
+
+def _repartir(k, n_tareas):
+    # El subárbol que empieza en el prefijo P recorre 2^(k-1-último) subconjuntos: los
+    # prefijos con subárbol grande se dividen (P solo y cada P + (j,)) hasta que ninguna
+    # tarea supere 2^k / n_tareas subconjuntos
+    objetivo = max(2 ** k // n_tareas, 1)
+    tareas = []
+    pendientes = [()]
+    while pendientes:
+        prefijo = pendientes.pop()
+        inicio = prefijo[-1] + 1 if prefijo else 0
+        if 2 ** (k - inicio) <= objetivo:
+            tareas.append((prefijo, True))
+            continue
+        if prefijo:
+            tareas.append((prefijo, False))
+        pendientes.extend(prefijo + (j,) for j in range(inicio, k))
+    return tareas
+
+def mejor_subconjunto(est, nombres, por_tamano=3, n_trabajadores=None):
+    import pandas as pd
+    k = len(nombres)
+    if k > MAX_EXHAUSTIVA:
+        raise ValueError(f"La búsqueda exhaustiva se limita a {MAX_EXHAUSTIVA} variables; "
+                         "usa un método por pasos.")
+    R, b, syy = _sistema_escalado(est)
+    if n_trabajadores is None or n_trabajadores <= 1:
+        resultados = [_tarea_exhaustiva(R, b, syy, (), True, por_tamano)]
+    else:
+        # Unas 8 tareas de tamaño parecido por trabajador reparten bien la carga
+        tareas = _repartir(k, 8 * n_trabajadores)
+        with ProcessPoolExecutor(n_trabajadores) as pool:
+            futuros = [pool.submit(_tarea_exhaustiva, R, b, syy, prefijo, explorar, por_tamano)
+                       for prefijo, explorar in tareas]
+            resultados = [f.result() for f in futuros]
+
+    mejores = {}
+    for parcial in resultados:
+        for heap in parcial.values():
+            for menos_rss, sub in heap:
+                _registrar(mejores, sub, -menos_rss, por_tamano)
+
+    filas = []
+    for heap in mejores.values():
+        for menos_rss, sub in heap:
+            r2, r2_aj, aic = _metricas(-menos_rss, len(sub), est.n, syy)
+            filas.append({"Variables": [nombres[i] for i in sub], "p": len(sub),
+                          "R²": r2, "R² ajustado": r2_aj, "AIC": aic})
+    filas.sort(key=lambda f: (f["AIC"], f["p"], f["Variables"]))
+    return pd.DataFrame(filas, columns=["Variables", "p", "R²", "R² ajustado", "AIC"])
+
+# --- Por pasos ---
+def _fila_paso(paso, accion, seleccion, nombres, rss, n, syy):
+    r2, r2_aj, aic = _metricas(rss, len(seleccion), n, syy)
+    return {"Paso": paso, "Acción": accion, "Variables": [nombres[i] for i in seleccion],
+            "p": len(seleccion), "R²": r2, "R² ajustado": r2_aj, "AIC": aic}
+
+def seleccion_hacia_adelante(est, nombres):
+    import pandas as pd
+    R, b, syy = _sistema_escalado(est)
+    seleccion = []
+    L, z = np.zeros((0, 0)), np.zeros(0)
+    filas = [_fila_paso(0, "(modelo vacío)", seleccion, nombres, syy, est.n, syy)]
+    while len(seleccion) < len(nombres):
+        mejor = None
+        for j in range(len(nombres)):
+            if j in seleccion:
+                continue
+            ext = _extender(R, b, L, z, seleccion, j)
+            if ext is None:
+                continue
+            rss = syy - ext[1] @ ext[1]
+            if mejor is None or rss < mejor[0]:
+                mejor = (rss, j, ext)
+        if mejor is None:
+            break
+        rss, j, (L, z) = mejor
+        seleccion.append(j)
+        filas.append(_fila_paso(len(filas), f"+ {nombres[j]}", seleccion, nombres, rss, est.n, syy))
+    return pd.DataFrame(filas)
+
+def seleccion_hacia_atras(est, nombres):
+    import pandas as pd
+    from scipy.linalg import solve_triangular
+    R, b, syy = _sistema_escalado(est)
+    # Se parte del mayor conjunto sin colinealidad exacta (Cholesky con descarte)
+    seleccion = []
+    L, z = np.zeros((0, 0)), np.zeros(0)
+    for j in range(len(nombres)):
+        ext = _extender(R, b, L, z, seleccion, j)
+        if ext is not None:
+            seleccion.append(j)
+            L, z = ext
+    descartadas = [nombres[j] for j in range(len(nombres)) if j not in seleccion]
+
+    rss = syy - z @ z
+    accion = "(modelo completo)" + (f" sin {', '.join(descartadas)} (colineales)" if descartadas else "")
+    filas = [_fila_paso(0, accion, seleccion, nombres, rss, est.n, syy)]
+    while seleccion:
+        # Se refactoriza cada conjunto restante (Cholesky, sin inversa) y se quita la
+        # variable cuyo conjunto restante deja el menor RSS = syy - zᵀz
+        mejor = None
+        for i in range(len(seleccion)):
+            resto = seleccion[:i] + seleccion[i + 1:]
+            if resto:
+                L = np.linalg.cholesky(R[np.ix_(resto, resto)])
+                z = solve_triangular(L, b[resto], lower=True)
+            else:
+                z = np.zeros(0)
+            rss = syy - z @ z
+            if mejor is None or rss < mejor[0]:
+                mejor = (rss, i)
+        rss, i = mejor
+        quitada = seleccion.pop(i)
+        filas.append(_fila_paso(len(filas), f"- {nombres[quitada]}", seleccion, nombres, rss, est.n, syy))
+    return pd.DataFrame(filas)